@@ -0,0 +1,15 @@
+import os
+import sys
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent / 'blogicum'
+
+
+def setup_django(settings_module, db_path=None):
+    """Настраивает Django в процессе бенчмарка на выбранную базу."""
+    os.environ['DJANGO_SETTINGS_MODULE'] = settings_module
+    if db_path is not None:
+        os.environ['BLOGICUM_DB'] = str(db_path)
+    sys.path.insert(0, str(PROJECT_DIR))
+    import django
+    django.setup()
@@ -0,0 +1,312 @@
+"""
+Нагрузочный стенд для страниц блога.
+
+Наполнить базу (через команду seed_blog):
+
+    python benchmarks/load_test.py seed --db /tmp/bench.sqlite3 \
+        --users 10000 --posts 100000 --comments 1000000
+
+Запустить сервер на этой базе и дать нагрузку:
+
+    BLOGICUM_DB=/tmp/bench.sqlite3 python blogicum/manage.py runserver
+    python benchmarks/load_test.py run --db /tmp/bench.sqlite3 \
+        --url http://127.0.0.1:8000 --concurrency 16 --duration 60 \
+        --output results/before.json
+
+Сравнить два прогона:
+
+    python benchmarks/load_test.py compare before.json after.json
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from http.cookiejar import CookieJar
+from pathlib import Path
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import HTTPCookieProcessor, Request, build_opener
+
+from common import PROJECT_DIR, setup_django
+
+PASSWORD = 'benchmark-password'
+
+# Маршрут и его доля в смеси запросов.
+ROUTES = {
+    'blog:index': 30,
+    'blog:category_posts': 15,
+    'blog:profile': 15,
+    'blog:post_detail': 35,
+    'blog:add_comment': 5,
+}
+
+
+def seed(args):
+    env = {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': args.settings,
+        'BLOGICUM_DB': str(args.db),
+    }
+    for command in (
+        ['migrate', '--verbosity', '0'],
+        [
+            'seed_blog', '--prefix', 'bench', '--password', PASSWORD,
+            '--users', str(args.users), '--posts', str(args.posts),
+            '--comments', str(args.comments),
+            '--categories', str(args.categories),
+            '--locations', str(args.locations),
+            '--seed', str(args.seed), '--workers', str(args.workers),
+        ],
+    ):
+        subprocess.run(
+            [sys.executable, 'manage.py', *command],
+            cwd=PROJECT_DIR, check=True, env=env,
+        )
+
+
+def load_targets(args):
+    """Адреса для нагрузки: случайная выборка из базы стенда."""
+    setup_django(args.settings, args.db)
+    from django.contrib.auth import get_user_model
+    from django.urls import reverse
+
+    from blog.models import Category
+    from blog.views import get_posts
+
+    post_ids = list(
+        get_posts(True).values_list('pk', flat=True)[:args.sample]
+    )
+    usernames = list(
+        get_user_model().objects.filter(username__startswith='bench')
+        .values_list('username', flat=True)[:args.sample]
+    )
+    slugs = list(
+        Category.objects.filter(is_published=True)
+        .values_list('slug', flat=True)
+    )
+    targets = {
+        'blog:index': lambda: reverse('blog:index'),
+        'blog:category_posts': lambda: reverse(
+            'blog:category_posts', args=[random.choice(slugs)]
+        ),
+        'blog:profile': lambda: reverse(
+            'blog:profile', args=[random.choice(usernames)]
+        ),
+        'blog:post_detail': lambda: reverse(
+            'blog:post_detail', args=[random.choice(post_ids)]
+        ),
+        'blog:add_comment': lambda: reverse(
+            'blog:add_comment', args=[random.choice(post_ids)]
+        ),
+    }
+    # Маршруты, которым в базе стенда не из чего выбирать.
+    missing = {}
+    if not slugs:
+        missing['blog:category_posts'] = 'опубликованных категорий'
+    if not usernames:
+        missing['blog:profile'] = 'пользователей bench*'
+        missing['blog:add_comment'] = 'пользователей bench*'
+    if not post_ids:
+        missing['blog:post_detail'] = 'опубликованных постов'
+        missing['blog:add_comment'] = 'опубликованных постов'
+    for name, what in missing.items():
+        del targets[name]
+        print(f'{name} пропущен: в базе нет {what}.', file=sys.stderr)
+    return targets, usernames
+
+
+class VirtualUser:
+    """Клиент со своей сессией; для комментариев входит на сайт."""
+
+    def __init__(self, base_url, username=None):
+        self.base_url = base_url.rstrip('/')
+        self.cookies = CookieJar()
+        self.opener = build_opener(HTTPCookieProcessor(self.cookies))
+        if username:
+            self.request('GET', '/auth/login/')
+            self.request('POST', '/auth/login/', {
+                'username': username, 'password': PASSWORD,
+            })
+
+    def csrf_token(self):
+        for cookie in self.cookies:
+            if cookie.name == 'csrftoken':
+                return cookie.value
+        return ''
+
+    def request(self, method, path, data=None):
+        body = None
+        if method == 'POST':
+            data = {**(data or {}), 'csrfmiddlewaretoken': self.csrf_token()}
+            body = urlencode(data).encode()
+        request = Request(
+            self.base_url + path, data=body, method=method,
+            headers={'Referer': self.base_url + path},
+        )
+        try:
+            with self.opener.open(request, timeout=30) as response:
+                response.read()
+                return response.status
+        except HTTPError as error:
+            return error.code
+
+
+def run(args):
+    targets, usernames = load_targets(args)
+    weights = dict(ROUTES)
+    for item in args.route or ():
+        name, weight = item.split('=')
+        weights[name] = int(weight)
+    names = [name for name in weights if weights[name] and name in targets]
+    if not names:
+        sys.exit(
+            'Нагружать нечего: заполните базу командой seed '
+            'или укажите маршруты через --route.'
+        )
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.duration
+
+    def client(number):
+        user = VirtualUser(
+            args.url,
+            usernames[number % len(usernames)]
+            if 'blog:add_comment' in names else None,
+        )
+        while time.monotonic() < deadline:
+            name = random.choices(names, [weights[n] for n in names])[0]
+            path = targets[name]()
+            started = time.perf_counter()
+            if name == 'blog:add_comment':
+                status = user.request('POST', path, {'text': 'Нагрузка'})
+            else:
+                status = user.request('GET', path)
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies[name].append(elapsed)
+                if status >= 400:
+                    errors[name] += 1
+
+    threads = [
+        threading.Thread(target=client, args=(number,))
+        for number in range(args.concurrency)
+    ]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.monotonic() - started
+    report = {
+        'started_at': datetime.now(timezone.utc).isoformat(),
+        'commit': _git_commit(),
+        'url': args.url,
+        'concurrency': args.concurrency,
+        'duration': round(wall, 2),
+        'routes': {
+            name: _summary(latencies[name], errors[name], wall)
+            for name in names if latencies[name]
+        },
+        'total': _summary(
+            [value for values in latencies.values() for value in values],
+            sum(errors.values()), wall
+        ),
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(text)
+    print(text)
+
+
+def _summary(latencies, errors, wall):
+    ms = sorted(value * 1000 for value in latencies)
+    cuts = statistics.quantiles(ms, n=100) if len(ms) > 1 else ms * 99
+    return {
+        'requests': len(ms),
+        'errors': errors,
+        'rps': round(len(ms) / wall, 1),
+        'p50_ms': round(cuts[49], 1),
+        'p95_ms': round(cuts[94], 1),
+        'p99_ms': round(cuts[98], 1),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(args):
+    before = json.loads(Path(args.before).read_text())
+    after = json.loads(Path(args.after).read_text())
+    print(f'{"маршрут":<22}{"метрика":<8}{"было":>10}{"стало":>10}')
+    routes = {**before['routes'], 'total': before['total']}
+    for name, old in routes.items():
+        new = after['total'] if name == 'total' else after['routes'].get(name)
+        if new is None:
+            continue
+        for metric in ('rps', 'p50_ms', 'p95_ms', 'p99_ms'):
+            print(
+                f'{name:<22}{metric:<8}{old[metric]:>10}{new[metric]:>10}'
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.split('\n')[1],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    seed_parser = commands.add_parser('seed', help='Наполнить базу стенда.')
+    seed_parser.add_argument('--users', type=int, default=10000)
+    seed_parser.add_argument('--posts', type=int, default=100000)
+    seed_parser.add_argument('--comments', type=int, default=1000000)
+    seed_parser.add_argument('--categories', type=int, default=20)
+    seed_parser.add_argument('--locations', type=int, default=50)
+    seed_parser.add_argument('--seed', type=int, default=0)
+    seed_parser.add_argument('--workers', type=int, default=1)
+    seed_parser.set_defaults(handler=seed)
+
+    run_parser = commands.add_parser('run', help='Дать нагрузку.')
+    run_parser.add_argument('--url', default='http://127.0.0.1:8000')
+    run_parser.add_argument('--concurrency', type=int, default=8)
+    run_parser.add_argument('--duration', type=float, default=30)
+    run_parser.add_argument('--sample', type=int, default=1000)
+    run_parser.add_argument(
+        '--route', action='append', metavar='ИМЯ=ВЕС',
+        help='Доля маршрута в смеси, например blog:add_comment=0.'
+    )
+    run_parser.add_argument('--output', help='Куда сохранить JSON.')
+    run_parser.set_defaults(handler=run)
+
+    for subparser in (seed_parser, run_parser):
+        subparser.add_argument('--db', required=True, type=Path)
+        subparser.add_argument('--settings', default='blogicum.settings')
+
+    compare_parser = commands.add_parser('compare', help='Сравнить прогоны.')
+    compare_parser.add_argument('before')
+    compare_parser.add_argument('after')
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == '__main__':
+    main()
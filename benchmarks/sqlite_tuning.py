@@ -0,0 +1,153 @@
+"""
+Сравнивает пропускную способность SQLite с настройками по умолчанию
+и с профилем blogicum.settings_production под конкурентной нагрузкой.
+
+    python benchmarks/sqlite_tuning.py --workers 8 --seconds 10
+
+Каждый процесс, как воркер gunicorn, в цикле читает ленту или
+добавляет комментарий, а после каждой операции закрывает соединение
+так же, как это делается в конце запроса. Для каждого профиля
+создаётся своя временная база; результат печатается в JSON.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from common import PROJECT_DIR, setup_django
+
+PROFILES = {
+    'default': 'blogicum.settings',
+    'production': 'blogicum.settings_production',
+}
+# Профиль production требует секретов из окружения; бенчмарку
+# подходят любые.
+os.environ.setdefault('DJANGO_SECRET_KEY', 'benchmark-only')
+os.environ.setdefault('DJANGO_ALLOWED_HOSTS', 'localhost')
+
+
+def prepare(settings_module, db_path, posts):
+    subprocess.run(
+        [sys.executable, 'manage.py', 'migrate', '--verbosity', '0'],
+        cwd=PROJECT_DIR, check=True,
+        env={
+            **os.environ,
+            'DJANGO_SETTINGS_MODULE': settings_module,
+            'BLOGICUM_DB': str(db_path),
+        },
+    )
+    setup_django(settings_module, db_path)
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+
+    from blog.models import Category, Location, Post
+
+    author = get_user_model().objects.create_user('bench', password='bench')
+    category = Category.objects.create(
+        title='Бенчмарк', description='', slug='bench'
+    )
+    location = Location.objects.create(name='Бенчмарк')
+    Post.objects.bulk_create(
+        Post(
+            title=f'Пост {i}', text='Текст', author=author,
+            category=category, location=location,
+            pub_date=timezone.now() - timedelta(minutes=i),
+        )
+        for i in range(posts)
+    )
+
+
+def worker(settings_module, db_path, seconds, write_ratio, results):
+    setup_django(settings_module, db_path)
+    from django.db import OperationalError, close_old_connections
+
+    from blog.models import Comments, Post
+    from blog.views import get_posts
+
+    author_id = Post.objects.values_list('author_id', flat=True).first()
+    post_ids = list(Post.objects.values_list('pk', flat=True))
+    close_old_connections()
+    reads = writes = locked = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        try:
+            if random.random() < write_ratio:
+                Comments.objects.create(
+                    text='Комментарий', author_id=author_id,
+                    post_id=random.choice(post_ids),
+                )
+                writes += 1
+            else:
+                list(get_posts(True)[:10])
+                reads += 1
+        except OperationalError:
+            locked += 1
+        # Конец «запроса»: соединение закрывается, если его
+        # не разрешено переиспользовать (CONN_MAX_AGE).
+        close_old_connections()
+    results.put((reads, writes, locked))
+
+
+def run_profile(name, settings_module, args):
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = Path(directory) / 'bench.sqlite3'
+        context = multiprocessing.get_context('spawn')
+        prep = context.Process(
+            target=prepare, args=(settings_module, db_path, args.posts)
+        )
+        prep.start()
+        prep.join()
+        results = context.Queue()
+        processes = [
+            context.Process(
+                target=worker,
+                args=(
+                    settings_module, db_path, args.seconds,
+                    args.write_ratio, results,
+                ),
+            )
+            for _ in range(args.workers)
+        ]
+        for process in processes:
+            process.start()
+        totals = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+    reads, writes, locked = (sum(column) for column in zip(*totals))
+    return {
+        'profile': name,
+        'settings': settings_module,
+        'reads': reads,
+        'writes': writes,
+        'locked_errors': locked,
+        'ops_per_second': round((reads + writes) / args.seconds, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--posts', type=int, default=1000)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    parser.add_argument(
+        '--profile', choices=PROFILES, action='append',
+        help='Какие профили сравнить; по умолчанию все.'
+    )
+    args = parser.parse_args()
+    report = [
+        run_profile(name, PROFILES[name], args)
+        for name in args.profile or PROFILES
+    ]
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import Category, Comments, Location, Post
+from .models import Category, Comments, ImageJob, Location, Post
+from .search import matching_ids
 
 
 class CategoryAdmin(admin.ModelAdmin):
@@ -42,6 +43,12 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ('pub_date', 'author')
     list_display_links = ('title',)
 
+    def get_search_results(self, request, queryset, search_term):
+        # Полнотекстовый индекс вместо LIKE '%...%' по всей таблице.
+        if not search_term:
+            return queryset, False
+        return queryset.filter(pk__in=matching_ids(search_term)), False
+
 
 class CommentsAdmin(admin.ModelAdmin):
     list_display = (
@@ -57,7 +64,21 @@ class CommentsAdmin(admin.ModelAdmin):
     list_filter = ('author', 'created_at')
 
 
+class ImageJobAdmin(admin.ModelAdmin):
+    list_display = (
+        'image',
+        'post',
+        'status',
+        'attempts',
+        'not_before',
+        'updated_at'
+    )
+    list_filter = ('status',)
+    readonly_fields = ('error',)
+
+
 admin.site.register(Category, CategoryAdmin)
 admin.site.register(Location, LocationAdmin)
 admin.site.register(Post, PostAdmin)
 admin.site.register(Comments, CommentsAdmin)
+admin.site.register(ImageJob, ImageJobAdmin)
@@ -0,0 +1,386 @@
+"""
+JSON API только для чтения: /api/v1/.
+
+Строки выбираются через values() без создания моделей, связанные
+автор, категория и местоположение берутся из blog.lookups. Поля
+можно сузить параметром ?fields=id,title,pub_date, списки листаются
+курсором ?cursor=, ответы отдаются с ETag и кэшируются до смены
+данных блога. Несколько постов по id отдаёт posts/batch/?ids=1,2,3 —
+одним запросом и с теми же правилами видимости, что у страницы поста.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.http import Http404, HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag, urlencode
+from django.views import View
+
+from .cache import (
+    content_state, get_generation, page_cache_timeout, read_generation
+)
+from .lookups import (
+    get_tables, published_category, user_by_username, users_by_id
+)
+from .paginators import InvalidCursor, KeysetPaginator
+from .views import (
+    ADD_FILTER, POSTS_NUM, get_posts, published_comments, visible_posts_q
+)
+
+MAX_PAGE_SIZE = 100
+MAX_BATCH_IDS = 500
+
+
+class ApiError(Exception):
+    pass
+
+
+def _usernames(rows):
+    """Логины авторов строк; берутся из памяти процесса."""
+    authors = users_by_id({row['author_id'] for row in rows})
+    return {pk: user.username for pk, user in authors.items()}
+
+
+def _image_url(row):
+    if not row['image'] or not row['image_ready']:
+        return None
+    return default_storage.url(row['image'])
+
+
+def _category(row):
+    category = get_tables()['categories'].get(row['category_id'])
+    return category.slug if category else None
+
+
+def _location(row):
+    location = get_tables()['locations'].get(row['location_id'])
+    if location is None or not location.is_published:
+        return None
+    return location.name
+
+
+# Поле ответа: (колонки для values(), преобразование строки).
+# Без преобразования берётся первая колонка, AUTHOR — логин автора.
+AUTHOR = 'author'
+POST_FIELDS = {
+    'id': (('id',), None),
+    'title': (('title',), None),
+    'text': (('text',), None),
+    'pub_date': (('pub_date',), None),
+    'updated_at': (('updated_at',), None),
+    'comment_count': (('comment_count',), None),
+    'image': (('image', 'image_ready'), _image_url),
+    'author': (('author_id',), AUTHOR),
+    'category': (('category_id',), _category),
+    'location': (('location_id',), _location),
+}
+COMMENT_FIELDS = {
+    'id': (('id',), None),
+    'text': (('text',), None),
+    'created_at': (('created_at',), None),
+    'post': (('post_id',), None),
+    'author': (('author_id',), AUTHOR),
+}
+CATEGORY_FIELDS = ('id', 'title', 'description', 'slug')
+PROFILE_FIELDS = ('id', 'username', 'first_name', 'last_name', 'date_joined')
+
+
+def parse_fields(request, available):
+    """Поля из ?fields=; без параметра — все."""
+    value = request.GET.get('fields')
+    if not value:
+        return list(available)
+    fields = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in available]
+    if unknown or not fields:
+        raise ApiError(
+            f'Неизвестные поля: {", ".join(unknown)}. '
+            f'Доступны: {", ".join(available)}.'
+        )
+    return fields
+
+
+def serialize(rows, fields, spec):
+    """Строки values() в словари только с запрошенными полями."""
+    authors = {}
+    if any(spec[name][1] == AUTHOR for name in fields):
+        authors = _usernames(rows)
+    results = []
+    for row in rows:
+        item = {}
+        for name in fields:
+            columns, convert = spec[name]
+            if convert is None:
+                item[name] = row[columns[0]]
+            elif convert == AUTHOR:
+                item[name] = authors.get(row['author_id'])
+            else:
+                item[name] = convert(row)
+        results.append(item)
+    return results
+
+
+class ApiView(View):
+    """
+    Основа представлений API: только GET, ответы в JSON,
+    условные запросы по ETag и кэш готовых ответов.
+    Данные ответа подклассы отдают из get_data().
+    """
+
+    read_from_replica = True
+    http_method_names = ('get', 'head', 'options')
+    # Ответ зависит от того, кто спрашивает.
+    per_viewer = False
+
+    def viewer(self, request):
+        if self.per_viewer and request.user.is_authenticated:
+            return str(request.user.pk)
+        return 'anonymous'
+
+    def get_etag(self, request, generation=None):
+        state = (
+            f'{content_state(generation)}:{self.viewer(request)}:'
+            f'{request.get_full_path()}'
+        )
+        return quote_etag(hashlib.md5(state.encode()).hexdigest())
+
+    def cached_response(self, request, generation):
+        """
+        Ответ из кэша готовых ответов. Прочитанное с реплики хранится
+        под её поколением данных, с реплики без поколения — не хранится.
+        """
+        key = None
+        if generation is not None:
+            key = f'blog:api:{self.get_etag(request, generation)}'
+            content = cache.get(key)
+            if content is not None:
+                return HttpResponse(content, content_type='application/json')
+        try:
+            data = self.get_data()
+        except Http404:
+            return JsonResponse({'error': 'Не найдено.'}, status=404)
+        except ApiError as error:
+            return JsonResponse({'error': str(error)}, status=400)
+        response = JsonResponse(
+            data, json_dumps_params={'ensure_ascii': False}
+        )
+        timeout = page_cache_timeout() if key else 0
+        if timeout:
+            cache.set(key, response.content, timeout)
+        return response
+
+    def get(self, request, *args, **kwargs):
+        current = get_generation()
+        etag = self.get_etag(request, current)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            generation = read_generation()
+            response = self.cached_response(request, generation)
+            if response.status_code != 200:
+                return response
+            if generation != current:
+                # Ответ с отстающей реплики: под текущим ETag клиент
+                # получал бы 304 на устаревшие данные.
+                etag = None
+        if etag:
+            response['ETag'] = etag
+        if self.viewer(request) == 'anonymous':
+            response['Cache-Control'] = 'no-cache'
+        else:
+            response['Cache-Control'] = 'private, no-cache'
+        return response
+
+
+class KeysetListApiView(ApiView):
+    """
+    Список с курсорной пагинацией и выбором полей; строки подклассы
+    отдают из get_queryset().
+    """
+
+    fields = POST_FIELDS
+    ordering = ('-pub_date', '-id')
+
+    def page_size(self):
+        try:
+            size = int(self.request.GET.get('limit', POSTS_NUM))
+        except ValueError:
+            raise ApiError('limit должен быть числом.')
+        return min(max(size, 1), MAX_PAGE_SIZE)
+
+    def page_url(self, cursor):
+        if cursor is None:
+            return None
+        query = self.request.GET.copy()
+        query['cursor'] = cursor
+        return f'{self.request.path}?{urlencode(query, doseq=True)}'
+
+    def get_data(self):
+        fields = parse_fields(self.request, self.fields)
+        keyset = [name.lstrip('-') for name in self.ordering]
+        columns = {
+            column for name in fields for column in self.fields[name][0]
+        }
+        queryset = self.get_queryset().values(*columns | set(keyset))
+        paginator = KeysetPaginator(queryset, self.page_size(), self.ordering)
+        try:
+            page = paginator.get_page(self.request.GET.get('cursor'))
+        except InvalidCursor as error:
+            raise ApiError(str(error))
+        return {
+            'results': serialize(page.object_list, fields, self.fields),
+            'next': self.page_url(page.next_cursor),
+            'previous': self.page_url(page.previous_cursor),
+        }
+
+
+class PostListApiView(KeysetListApiView):
+    """Лента; ?category=slug и ?author=username сужают её."""
+
+    def get_queryset(self):
+        queryset = get_posts(ADD_FILTER)
+        slug = self.request.GET.get('category')
+        if slug:
+            category = published_category(slug)
+            if category is None:
+                raise Http404
+            queryset = queryset.filter(category=category)
+        username = self.request.GET.get('author')
+        if username:
+            author = user_by_username(username)
+            if author is None:
+                raise Http404
+            queryset = queryset.filter(author=author)
+        return queryset
+
+
+class PostApiView(ApiView):
+
+    def get_data(self):
+        fields = parse_fields(self.request, POST_FIELDS)
+        columns = {
+            column for name in fields for column in POST_FIELDS[name][0]
+        }
+        rows = list(
+            get_posts(ADD_FILTER).filter(pk=self.kwargs['post_id'])
+            .values(*columns)
+        )
+        if not rows:
+            raise Http404
+        return serialize(rows, fields, POST_FIELDS)[0]
+
+
+class PostLoader:
+    """
+    Загрузчик постов в духе DataLoader: load_many() отдаёт строки
+    в порядке запрошенных id, а всё, чего ещё нет в памяти, достаёт
+    одним запросом. Видимость проверяется в SQL, как у страницы
+    поста: автор видит и свои скрытые и отложенные посты.
+    """
+
+    def __init__(self, user, columns):
+        self.user = user
+        self.columns = set(columns) | {'id'}
+        self.rows = {}
+
+    def load_many(self, ids):
+        missing = [pk for pk in dict.fromkeys(ids) if pk not in self.rows]
+        if missing:
+            found = {
+                row['id']: row for row in get_posts().filter(
+                    visible_posts_q(self.user), pk__in=missing
+                ).order_by().values(*self.columns)
+            }
+            for pk in missing:
+                self.rows[pk] = found.get(pk)
+        return [self.rows[pk] for pk in ids]
+
+
+def parse_ids(request):
+    """Id из ?ids=1,2,3 без повторов, в исходном порядке."""
+    value = request.GET.get('ids', '')
+    try:
+        ids = [int(pk) for pk in value.split(',') if pk.strip()]
+    except ValueError:
+        raise ApiError('ids должен быть списком чисел через запятую.')
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        raise ApiError('Укажите id постов: ?ids=1,2,3.')
+    if len(ids) > MAX_BATCH_IDS:
+        raise ApiError(f'Не больше {MAX_BATCH_IDS} id за запрос.')
+    return ids
+
+
+class PostBatchApiView(ApiView):
+    """
+    Несколько постов по id одним запросом. Посты, которых нет или
+    которые читателю не видны, перечисляются в missing.
+    """
+
+    per_viewer = True
+
+    def get_data(self):
+        fields = parse_fields(self.request, POST_FIELDS)
+        ids = parse_ids(self.request)
+        columns = {
+            column for name in fields for column in POST_FIELDS[name][0]
+        }
+        rows = PostLoader(self.request.user, columns).load_many(ids)
+        return {
+            'results': serialize(
+                [row for row in rows if row is not None], fields, POST_FIELDS
+            ),
+            'missing': [pk for pk, row in zip(ids, rows) if row is None],
+        }
+
+
+class CommentListApiView(KeysetListApiView):
+    fields = COMMENT_FIELDS
+    ordering = ('created_at', 'id')
+
+    def get_queryset(self):
+        if not get_posts(ADD_FILTER).filter(
+            pk=self.kwargs['post_id']
+        ).exists():
+            raise Http404
+        return published_comments(self.kwargs['post_id'])
+
+
+class CategoryListApiView(ApiView):
+    """Опубликованные категории; их немного, поэтому без пагинации."""
+
+    def get_data(self):
+        fields = parse_fields(self.request, CATEGORY_FIELDS)
+        categories = sorted(
+            (
+                category for category in get_tables()['categories'].values()
+                if category.is_published
+            ),
+            key=lambda category: category.title
+        )
+        return {
+            'results': [
+                {name: getattr(category, name) for name in fields}
+                for category in categories
+            ],
+        }
+
+
+class CategoryApiView(ApiView):
+
+    def get_data(self):
+        fields = parse_fields(self.request, CATEGORY_FIELDS)
+        category = published_category(self.kwargs['category_slug'])
+        if category is None:
+            raise Http404
+        return {name: getattr(category, name) for name in fields}
+
+
+class ProfileApiView(ApiView):
+
+    def get_data(self):
+        fields = parse_fields(self.request, PROFILE_FIELDS)
+        profile = user_by_username(self.kwargs['username'])
+        if profile is None:
+            raise Http404
+        return {name: getattr(profile, name) for name in fields}
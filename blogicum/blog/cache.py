@@ -0,0 +1,347 @@
+import hashlib
+import re
+import time
+from calendar import timegm
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag, urlencode
+
+from blogicum.replicas import read_alias
+
+from .lookups import USERS_VERSION_KEY, get_version
+from .schedule import next_go_live
+
+
+GENERATION_KEY = 'blog:generation'
+REPLICA_GENERATION_KEY = 'blog:replica-generation:{}'
+# Ключи ниже зависят от поколения, поэтому их можно хранить долго.
+NEXT_PUBLICATION_TIMEOUT = 60 * 60
+CHANGED_AT_TIMEOUT = 60 * 60 * 24
+
+# Места общей страницы, которые заполняются для каждого читателя.
+VIEWER_SLOT = '<!--viewer-->'
+CSRF_PLACEHOLDER = 'csrf-token-placeholder'
+# Поле, которое выводит {% csrf_token %}. Заменяется только оно целиком:
+# экранированный пользовательский текст не может содержать «<» и «"».
+CSRF_INPUT = '<input type="hidden" name="csrfmiddlewaretoken" value="{}">'
+AUTHOR_BLOCK = re.compile(r'<!--author:(\d+)-->(.*?)<!--/author-->', re.S)
+# Параметры адреса, от которых зависит страница. Остальные в ключ
+# не входят: иначе любой ?x=1, ?x=2… заводил бы в кэше новую запись.
+PAGE_CACHE_PARAMS = ('page', 'cursor')
+# Счётчики ответов копятся в памяти процесса и переносятся в общий кэш
+# не чаще раза в столько секунд: запись в FileBasedCache просматривает
+# весь каталог кэша, а ответ 304 должен оставаться дешёвым.
+RESPONSE_COUNTS_FLUSH_INTERVAL = 60
+
+# Счётчики текущего процесса, ещё не перенесённые в общий кэш.
+_responses = {'counts': Counter(), 'flushed_at': time.monotonic()}
+
+
+def check_shared_cache(app_configs=None, **kwargs):
+    """
+    Поколение данных и версии справочников поднимает тот процесс,
+    который изменил данные, а видеть их должны все процессы сервера.
+    Кэш в памяти процесса для этого не годится.
+    """
+    if isinstance(caches['default'], LocMemCache):
+        return [
+            Error(
+                'Кэш блога должен быть общим для всех процессов сервера: '
+                'LocMemCache не подходит.',
+                hint='Настройте CACHES на Memcached или FileBasedCache.',
+                id='blog.E001',
+            )
+        ]
+    return []
+
+
+def get_generation():
+    """
+    Номер поколения данных блога.
+    Входит в ключи кэша: после изменения контента поколение растёт,
+    и все старые записи перестают находиться. Начальное значение берётся
+    из часов, чтобы после вытеснения ключа номера не повторялись.
+    """
+    return cache.get_or_set(GENERATION_KEY, time.time_ns, None)
+
+
+def bump_generation():
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, time.time_ns(), None)
+
+
+def set_replica_generation(alias, generation):
+    cache.set(REPLICA_GENERATION_KEY.format(alias), generation, None)
+
+
+def read_generation():
+    """
+    Поколение данных, которые читает текущий запрос. У реплики это
+    поколение, записанное sync_replicas перед копированием. Если его
+    нет (реплику обновили в обход команды), возвращается None,
+    и прочитанное с реплики в кэш не попадает.
+    """
+    alias = read_alias()
+    if alias is None:
+        return get_generation()
+    return cache.get(REPLICA_GENERATION_KEY.format(alias))
+
+
+def next_publication():
+    """Момент, когда появится ближайшая отложенная публикация, или None."""
+    key = f'blog:next-publication:{get_generation()}'
+    go_live = cache.get(key)
+    if go_live is None or go_live and go_live <= timezone.now():
+        # False отличает «отложенных публикаций нет» от промаха кэша.
+        go_live = next_go_live() or False
+        cache.set(key, go_live, NEXT_PUBLICATION_TIMEOUT)
+    return go_live or None
+
+
+def page_cache_timeout():
+    """Срок жизни страницы: не дольше, чем до ближайшей публикации."""
+    timeout = settings.PAGE_CACHE_TIMEOUT
+    if not timeout:
+        return 0
+    go_live = next_publication()
+    if go_live is not None:
+        seconds = (go_live - timezone.now()).total_seconds()
+        timeout = min(timeout, int(seconds))
+    return max(timeout, 0)
+
+
+def page_cache_key(request, audience, generation):
+    """
+    Ключ страницы: поколение прочитанных данных, путь и параметры
+    постраничного вывода. Ближайшая публикация входит в него, чтобы
+    с её выходом страница сменилась независимо от того, как бэкенд
+    кэша считает запись на границе срока жизни.
+    """
+    params = urlencode([
+        (name, request.GET[name])
+        for name in PAGE_CACHE_PARAMS if name in request.GET
+    ])
+    url = hashlib.md5(f'{request.path}?{params}'.encode()).hexdigest()
+    go_live = next_publication()
+    return (
+        f'blog:page:{generation}:'
+        f'{go_live.timestamp() if go_live else 0}:{audience}:{url}'
+    )
+
+
+def apply_overlay(response, request):
+    """
+    Дополняет общую для всех авторизованных читателей страницу:
+    меню пользователя, CSRF-токен и кнопки автора.
+    """
+    user = request.user
+    content = response.content.decode(response.charset)
+    content = content.replace(
+        VIEWER_SLOT,
+        render_to_string('includes/viewer_menu.html', {'user': user})
+    )
+    placeholder = CSRF_INPUT.format(CSRF_PLACEHOLDER)
+    if placeholder in content:
+        content = content.replace(
+            placeholder, CSRF_INPUT.format(get_token(request))
+        )
+    content = AUTHOR_BLOCK.sub(
+        lambda match: match[2] if int(match[1]) == user.pk else '',
+        content
+    )
+    response.content = content
+
+
+class PageCacheMixin:
+    """
+    Отдаёт страницу целиком из кэша.
+    Анонимные читатели получают одну общую копию. Авторизованные —
+    другую, в которой всё личное оставлено местами для apply_overlay.
+    """
+
+    page_overlay = False
+
+    def is_page_shared(self):
+        """Можно ли показать эту страницу другим читателям."""
+        return True
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if self.page_overlay:
+            context['page_overlay'] = True
+            context['csrf_token'] = CSRF_PLACEHOLDER
+        return context
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'GET':
+            return super().dispatch(request, *args, **kwargs)
+        self.page_overlay = request.user.is_authenticated
+        # Реплика отдаёт данные своего поколения, под ним страница
+        # и хранится: пока реплика отстаёт, её читатели получают
+        # одну и ту же копию, а после синхронизации — новую.
+        generation = read_generation()
+        key = None
+        if generation is not None:
+            key = page_cache_key(
+                request, 'user' if self.page_overlay else 'anonymous',
+                generation
+            )
+            response = cache.get(key)
+            if response is not None:
+                if self.page_overlay:
+                    apply_overlay(response, request)
+                return response
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+        timeout = 0
+        if key and not response.cookies and self.is_page_shared():
+            timeout = page_cache_timeout()
+
+        def finish(response):
+            if timeout:
+                cache.set(key, response, timeout)
+            if self.page_overlay:
+                apply_overlay(response, request)
+
+        response.add_post_render_callback(finish)
+        return response
+
+
+def content_state(generation=None):
+    """
+    Версия всего, что показывают страницы блога: поколение данных
+    (по умолчанию текущее), сводки пользователей и ближайшая отложенная
+    публикация (после неё лента меняется без сигналов).
+    """
+    if generation is None:
+        generation = get_generation()
+    go_live = next_publication()
+    return (
+        f'{generation}:{get_version(USERS_VERSION_KEY)}:'
+        f'{go_live.timestamp() if go_live else 0}'
+    )
+
+
+def changed_at(state):
+    """Когда страницы впервые показали версию контента state."""
+    return cache.get_or_set(
+        f'blog:changed-at:{state}',
+        lambda: timezone.now().replace(microsecond=0),
+        CHANGED_AT_TIMEOUT
+    )
+
+
+def _response_key(view_name, status):
+    return f'blog:responses:{view_name}:{status}'
+
+
+def count_response(view_name, status_code):
+    _responses['counts'][view_name, status_code] += 1
+    if (
+        time.monotonic() - _responses['flushed_at']
+        >= RESPONSE_COUNTS_FLUSH_INTERVAL
+    ):
+        flush_response_counts()
+
+
+def flush_response_counts():
+    """Переносит счётчики процесса в общий кэш."""
+    counts, _responses['counts'] = _responses['counts'], Counter()
+    _responses['flushed_at'] = time.monotonic()
+    for (view_name, status), number in counts.items():
+        key = _response_key(view_name, status)
+        if not cache.add(key, number, None):
+            cache.incr(key, number)
+
+
+def response_counts(view_name):
+    """Сколько ответов 200 и 304 отдало представление."""
+    return {
+        status: cache.get(_response_key(view_name, status), 0)
+        for status in (200, 304)
+    }
+
+
+def reset_response_counts(view_name):
+    for status in (200, 304):
+        _responses['counts'].pop((view_name, status), None)
+    cache.delete_many(
+        [_response_key(view_name, status) for status in (200, 304)]
+    )
+
+
+class ConditionalPageMixin:
+    """
+    Отвечает 304, если у браузера или поискового робота уже есть
+    актуальная копия страницы, не выполняя запросов и не рендеря шаблон.
+    ETag строится по версии контента, адресу и читателю; Last-Modified
+    отдаётся только анонимным читателям, у которых нет личных частей.
+    Страница, собранная по отстающей реплике, валидаторов не получает.
+    """
+
+    def get_etag(self, request, state):
+        viewer = 'anonymous'
+        if request.user.is_authenticated:
+            # Токен CSRF в формах страницы меняется вместе с cookie.
+            viewer = (
+                f'{request.user.pk}:'
+                f'{request.COOKIES.get(settings.CSRF_COOKIE_NAME, "")}'
+            )
+        state = f'{state}:{viewer}:{request.get_full_path()}'
+        return quote_etag(hashlib.md5(state.encode()).hexdigest())
+
+    def get_last_modified(self, request, state):
+        if request.user.is_authenticated:
+            return None
+        return changed_at(state)
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        generation = get_generation()
+        state = content_state(generation)
+        etag = self.get_etag(request, state)
+        last_modified = self.get_last_modified(request, state)
+        response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=last_modified and timegm(
+                last_modified.utctimetuple()
+            ),
+        )
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+            if read_generation() != generation:
+                # Страница собрана по отстающей реплике: с текущими
+                # валидаторами браузер получал бы 304 на устаревшую копию.
+                etag = last_modified = None
+        count_response(type(self).__name__, response.status_code)
+        if response.status_code in (200, 304):
+            # Заголовки ставим заново: ответ мог прийти из кэша страниц
+            # с заголовками другого читателя.
+            if etag:
+                response['ETag'] = etag
+            elif response.has_header('ETag'):
+                del response['ETag']
+            if last_modified:
+                response['Last-Modified'] = http_date(
+                    timegm(last_modified.utctimetuple())
+                )
+            elif response.has_header('Last-Modified'):
+                del response['Last-Modified']
+            response['Cache-Control'] = (
+                'private, no-cache' if request.user.is_authenticated
+                else 'no-cache'
+            )
+        return response
@@ -0,0 +1,171 @@
+import hashlib
+
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import Http404
+from django.urls import reverse
+from django.utils.feedgenerator import Rss201rev2Feed
+from django.utils.text import Truncator
+from django.views.decorators.http import condition
+
+from .cache import get_generation, page_cache_timeout
+from .lookups import published_category, user_by_username
+from .views import ADD_FILTER, get_posts
+
+FEED_ITEMS = 20
+DESCRIPTION_WORDS = 60
+
+
+class PostsFeed(Feed):
+    """
+    Лента последних публикаций в RSS или Atom.
+    Отдаёт ETag и Last-Modified, так что агрегатор, который опрашивает
+    ленту без изменений, получает 304 без выборки постов.
+    """
+
+    title = 'Блогикум'
+    description = 'Новые публикации Блогикума'
+
+    def __init__(self, feed_type=Rss201rev2Feed):
+        super().__init__()
+        self.feed_type = feed_type
+
+    def __call__(self, request, *args, **kwargs):
+        view = condition(
+            etag_func=self.etag, last_modified_func=self.last_modified
+        )(super().__call__)
+        return view(request, *args, **kwargs)
+
+    def etag(self, request, *args, **kwargs):
+        return self.validators(request, *args, **kwargs)[0]
+
+    def last_modified(self, request, *args, **kwargs):
+        return self.validators(request, *args, **kwargs)[1]
+
+    def link(self, obj):
+        return reverse('blog:index')
+
+    def subtitle(self, obj):
+        return self.description
+
+    def get_posts(self, obj):
+        return get_posts(ADD_FILTER)
+
+    def items(self, obj):
+        return self.get_posts(obj)[:FEED_ITEMS]
+
+    def validators(self, request, *args, **kwargs):
+        """
+        ETag и дата изменения ленты: по id и датам постов, которые в неё
+        попадут. Хранятся в кэше до смены поколения данных блога или до
+        ближайшей отложенной публикации.
+        """
+        if not hasattr(request, 'feed_validators'):
+            path = hashlib.md5(request.path.encode()).hexdigest()
+            key = f'blog:feed:{get_generation()}:{path}'
+            validators = cache.get(key)
+            if validators is None:
+                validators = self.compute_validators(
+                    request, *args, **kwargs
+                )
+                timeout = page_cache_timeout()
+                if timeout:
+                    cache.set(key, validators, timeout)
+            request.feed_validators = validators
+        return request.feed_validators
+
+    def compute_validators(self, request, *args, **kwargs):
+        obj = self.get_object(request, *args, **kwargs)
+        rows = list(
+            self.items(obj).values_list('pk', 'pub_date', 'updated_at')
+        )
+        state = repr((self.feed_type.__name__, self.feed_state(obj), rows))
+        last_modified = max(
+            (max(pub_date, updated_at) for _, pub_date, updated_at in rows),
+            default=None
+        )
+        return hashlib.md5(state.encode()).hexdigest(), last_modified
+
+    def feed_state(self, obj):
+        """То, что кроме постов меняет ленту и поэтому входит в ETag."""
+        return self.title
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return Truncator(item.text).words(DESCRIPTION_WORDS)
+
+    def item_link(self, item):
+        return reverse('blog:post_detail', args=[item.pk])
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_author_link(self, item):
+        return reverse('blog:profile', args=[item.author.username])
+
+    def item_categories(self, item):
+        if item.category is None:
+            return ()
+        return (item.category.title,)
+
+
+class CategoryFeed(PostsFeed):
+
+    def get_object(self, request, category_slug):
+        category = published_category(category_slug)
+        if category is None:
+            raise Http404
+        return category
+
+    def title(self, obj):
+        return f'Блогикум: {obj.title}'
+
+    def description(self, obj):
+        return obj.description
+
+    def subtitle(self, obj):
+        return obj.description
+
+    def feed_state(self, obj):
+        return (obj.title, obj.description)
+
+    def link(self, obj):
+        return reverse('blog:category_posts', args=[obj.slug])
+
+    def get_posts(self, obj):
+        return get_posts(ADD_FILTER).filter(category=obj)
+
+
+class ProfileFeed(PostsFeed):
+
+    def get_object(self, request, username):
+        profile = user_by_username(username)
+        if profile is None:
+            raise Http404
+        return profile
+
+    def title(self, obj):
+        return f'Блогикум: {obj.get_full_name() or obj.username}'
+
+    def description(self, obj):
+        return f'Публикации пользователя {obj.username}'
+
+    def subtitle(self, obj):
+        return self.description(obj)
+
+    def feed_state(self, obj):
+        return (obj.username, obj.get_full_name())
+
+    def link(self, obj):
+        return reverse('blog:profile', args=[obj.username])
+
+    def get_posts(self, obj):
+        return get_posts(ADD_FILTER).filter(author=obj)
@@ -0,0 +1,103 @@
+import posixpath
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+
+# Вариант: наибольшая сторона в пикселях.
+VARIANTS = {
+    'card': 640,
+    'detail': 1280,
+}
+FORMATS = {
+    'jpeg': ('JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+    'webp': ('WEBP', {'quality': 80, 'method': 6}),
+}
+# Параметры пересохранения оригинала без EXIF.
+SAVE_OPTIONS = {
+    'JPEG': {'quality': 95},
+    'WEBP': {'quality': 95},
+}
+
+
+def variant_name(name, variant, fmt='jpeg'):
+    """posts_images/photo.png -> posts_images/photo_card.jpeg"""
+    root, _ = posixpath.splitext(name)
+    return f'{root}_{variant}.{fmt}'
+
+
+def variant_names(name):
+    return [
+        variant_name(name, variant, fmt)
+        for variant in VARIANTS
+        for fmt in FORMATS
+    ]
+
+
+def make_variants(name, storage=default_storage, force=False):
+    """
+    Сохраняет рядом с оригиналом уменьшенные копии во всех форматах.
+    Возвращает число созданных файлов.
+    """
+    targets = [
+        (variant, fmt, variant_name(name, variant, fmt))
+        for variant in VARIANTS
+        for fmt in FORMATS
+    ]
+    if not force:
+        targets = [
+            target for target in targets if not storage.exists(target[2])
+        ]
+    if not targets:
+        return 0
+    with storage.open(name) as original:
+        image = ImageOps.exif_transpose(Image.open(original))
+        image = image.convert('RGB')
+    for variant, fmt, target in targets:
+        size = VARIANTS[variant]
+        resized = image.copy()
+        resized.thumbnail((size, size), Image.LANCZOS)
+        pil_format, options = FORMATS[fmt]
+        buffer = BytesIO()
+        resized.save(buffer, pil_format, **options)
+        storage.delete(target)
+        storage.save(target, ContentFile(buffer.getvalue()))
+    return len(targets)
+
+
+def clean_original(name, storage=default_storage):
+    """
+    Проверяет загруженную картинку и перезаписывает её без метаданных
+    EXIF (координаты съёмки, модель камеры), повернув по ориентации.
+    """
+    with storage.open(name) as original:
+        Image.open(original).verify()
+    with storage.open(name) as original:
+        image = Image.open(original)
+        pil_format = image.format
+        image = ImageOps.exif_transpose(image)
+        if pil_format == 'JPEG':
+            image = image.convert('RGB')
+        buffer = BytesIO()
+        image.save(buffer, pil_format, **SAVE_OPTIONS.get(pil_format, {}))
+    storage.delete(name)
+    storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def process_image(name, storage=default_storage):
+    """Полная обработка загруженной картинки: очистка и все копии."""
+    clean_original(name, storage)
+    return make_variants(name, storage, force=True)
+
+
+def variant_url(image, variant, fmt='jpeg', fallback=True,
+                storage=default_storage):
+    """Адрес уменьшенной копии, а пока её нет — адрес оригинала."""
+    if not image:
+        return ''
+    name = variant_name(image.name, variant, fmt)
+    if storage.exists(name):
+        return storage.url(name)
+    return image.url if fallback else ''
@@ -0,0 +1,135 @@
+from datetime import timedelta
+
+from django.db.models import F
+from django.utils import timezone
+from PIL import Image, UnidentifiedImageError
+
+from .cache import bump_generation
+from .images import process_image
+from .models import ImageJob, Post
+
+# Пауза перед второй попыткой; дальше растёт вчетверо с каждой.
+RETRY_DELAY = timedelta(seconds=30)
+# Файл не картинка или слишком велик для распаковки: повтор не поможет.
+INVALID_IMAGE_ERRORS = (UnidentifiedImageError, Image.DecompressionBombError)
+
+
+def enqueue_image(post):
+    """Ставит картинку поста в очередь; до обработки видна заглушка."""
+    Post.objects.filter(pk=post.pk).update(image_ready=False)
+    post.image_ready = False
+    return ImageJob.objects.create(post=post, image=post.image.name)
+
+
+def claim_job():
+    """
+    Забирает самое старое задание из очереди.
+    Задание переводится в работу условным UPDATE, поэтому два
+    обработчика не возьмут одно и то же. Задания, отложенные
+    до повторной попытки, ждут своего not_before.
+    """
+    pending = ImageJob.objects.filter(
+        status=ImageJob.PENDING, not_before__lte=timezone.now()
+    )
+    while True:
+        job = pending.order_by('created_at', 'pk').first()
+        if job is None:
+            return None
+        claimed = pending.filter(pk=job.pk).update(
+            status=ImageJob.RUNNING,
+            attempts=F('attempts') + 1,
+            updated_at=timezone.now()
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+
+def retry_at(attempts):
+    """Когда повторить задание после attempts неудачных попыток."""
+    return timezone.now() + RETRY_DELAY * 4 ** (attempts - 1)
+
+
+def fall_back_to_original(job):
+    """
+    Хранилище так и не ответило: вместо вечной заглушки пост показывает
+    загруженный оригинал, уменьшенных копий у него нет. Файлы, не
+    прошедшие проверку, сюда не попадают.
+    """
+    if Post.objects.filter(pk=job.post_id, image=job.image).update(
+        image_ready=True, updated_at=timezone.now()
+    ):
+        bump_generation()
+
+
+def after_failure(job, max_attempts):
+    """Состояние задания после неудачной попытки."""
+    if job.attempts < max_attempts:
+        return {
+            'status': ImageJob.PENDING,
+            'not_before': retry_at(job.attempts),
+        }
+    return {'status': ImageJob.FAILED}
+
+
+def save_failure(job, error, state):
+    job.error = f'{type(error).__name__}: {error}'
+    for name, value in state.items():
+        setattr(job, name, value)
+    job.save(update_fields=(*state, 'error', 'updated_at'))
+
+
+def run_job(job, max_attempts=3):
+    """Обрабатывает картинку; возвращает True при успехе."""
+    current = Post.objects.filter(pk=job.post_id, image=job.image)
+    if current.exists():
+        try:
+            process_image(job.image)
+        except INVALID_IMAGE_ERRORS as error:
+            # Файл не прошёл проверку: показывать его нельзя,
+            # у поста остаётся заглушка.
+            save_failure(job, error, {'status': ImageJob.FAILED})
+            return False
+        except Exception as error:
+            # Сбой хранилища: пробуем ещё раз с паузой, пока не кончатся
+            # попытки; до тех пор видна заглушка.
+            save_failure(job, error, after_failure(job, max_attempts))
+            if job.status == ImageJob.FAILED:
+                fall_back_to_original(job)
+            return False
+        # Новое updated_at сбрасывает закэшированную карточку поста.
+        if current.update(image_ready=True, updated_at=timezone.now()):
+            bump_generation()
+    # Если картинку успели заменить, её обработает следующее задание.
+    job.status = ImageJob.DONE
+    job.error = ''
+    job.save(update_fields=('status', 'error', 'updated_at'))
+    return True
+
+
+def requeue_stale(older_than, max_attempts=3):
+    """
+    Возвращает в очередь задания упавших обработчиков. Задание,
+    которое раз за разом роняет обработчик, после max_attempts
+    попыток помечается ошибкой; картинку, на которой падает
+    обработка, не показываем — у поста остаётся заглушка.
+    """
+    stale = ImageJob.objects.filter(
+        status=ImageJob.RUNNING,
+        updated_at__lt=timezone.now() - older_than
+    )
+    requeued = 0
+    for job in stale:
+        state = after_failure(job, max_attempts)
+        # Задание мог уже вернуть в очередь другой обработчик.
+        if not ImageJob.objects.filter(
+            pk=job.pk, status=ImageJob.RUNNING
+        ).update(
+            error='Обработчик не завершил задание.',
+            updated_at=timezone.now(),
+            **state
+        ):
+            continue
+        if state['status'] == ImageJob.PENDING:
+            requeued += 1
+    return requeued
@@ -0,0 +1,170 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router
+
+from .models import Category, Location, Post
+
+
+VERSION_KEY = 'blog:lookups:version'
+USERS_VERSION_KEY = 'blog:users:version'
+
+# Поля пользователя, нужные карточкам постов и шапке профиля.
+USER_FIELDS = (
+    'id', 'username', 'first_name', 'last_name', 'date_joined', 'is_staff'
+)
+MAX_USERS = 10000
+# Через сколько секунд таблицы процесса перечитываются, даже если
+# версия не менялась: страховка от изменений в обход сигналов
+# (update(), правка базы вручную) и от потери ключа версии.
+TABLES_MAX_AGE = 60
+
+User = get_user_model()
+
+# Таблицы текущего процесса; заменяются целиком при смене версии.
+_tables = {}
+_users = {'version': None, 'loaded_at': 0, 'ids': {}, 'usernames': {}}
+
+
+def get_version(key=VERSION_KEY):
+    return cache.get_or_set(key, time.time_ns, None)
+
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def bump_lookups():
+    _bump(VERSION_KEY)
+
+
+def bump_users():
+    _bump(USERS_VERSION_KEY)
+
+
+def _expired(tables):
+    return time.monotonic() - tables.get('loaded_at', 0) > TABLES_MAX_AGE
+
+
+def get_tables():
+    """
+    Категории и местоположения из памяти процесса.
+    Таблицы маленькие и меняются редко, поэтому читаются целиком
+    и перечитываются, когда сигналы поднимают версию или истекает
+    TABLES_MAX_AGE.
+    """
+    global _tables
+    version = get_version()
+    if _tables.get('version') != version or _expired(_tables):
+        # Таблицы перечитываются сразу после изменения, поэтому
+        # с основной базы: реплика может ещё не догнать её.
+        primary = router.db_for_write(Category)
+        categories = list(Category.objects.using(primary))
+        locations = list(Location.objects.using(primary))
+        _tables = {
+            'version': version,
+            'loaded_at': time.monotonic(),
+            'categories': {category.pk: category for category in categories},
+            'category_slugs': {
+                category.slug: category for category in categories
+            },
+            'locations': {location.pk: location for location in locations},
+        }
+    return _tables
+
+
+def published_category(slug):
+    category = get_tables()['category_slugs'].get(slug)
+    if category is not None and category.is_published:
+        return category
+    return None
+
+
+def unpublished_category_ids():
+    return [
+        category.pk for category in get_tables()['categories'].values()
+        if not category.is_published
+    ]
+
+
+def _user_tables():
+    global _users
+    version = get_version(USERS_VERSION_KEY)
+    if (
+        _users['version'] != version or _expired(_users)
+        or len(_users['ids']) > MAX_USERS
+    ):
+        _users = {
+            'version': version,
+            'loaded_at': time.monotonic(),
+            'ids': {},
+            'usernames': {},
+        }
+    return _users
+
+
+def _remember(rows):
+    tables = _user_tables()
+    for row in rows:
+        tables['ids'][row[0]] = row
+        tables['usernames'][row[1]] = row
+
+
+def _user(row):
+    """Пользователь только с полями USER_FIELDS, остальные отложены."""
+    values = dict(zip(USER_FIELDS, row))
+    fields = [field.attname for field in User._meta.concrete_fields]
+    return User.from_db(
+        router.db_for_read(User),
+        [name for name in fields if name in values],
+        [values[name] for name in fields if name in values]
+    )
+
+
+def users_by_id(ids):
+    """Пользователи по id; в базу идут только те, кого нет в памяти."""
+    missing = set(ids) - _user_tables()['ids'].keys()
+    if missing:
+        _remember(
+            User.objects.using(router.db_for_write(User))
+            .filter(pk__in=missing).values_list(*USER_FIELDS)
+        )
+    known = _user_tables()['ids']
+    return {pk: _user(known[pk]) for pk in ids if pk in known}
+
+
+def user_by_username(username):
+    row = _user_tables()['usernames'].get(username)
+    if row is None:
+        row = User.objects.using(router.db_for_write(User)).filter(
+            username=username
+        ).values_list(*USER_FIELDS).first()
+        if row is None:
+            return None
+        _remember([row])
+    return _user(row)
+
+
+def fill_lookups(posts):
+    """Подставляет постам авторов, категории и местоположения."""
+    authors = users_by_id({post.author_id for post in posts})
+    author_field = Post._meta.get_field('author')
+    for post in posts:
+        if post.author_id in authors:
+            author_field.set_cached_value(post, authors[post.author_id])
+    tables = get_tables()
+    for name, table in (
+        ('category', tables['categories']),
+        ('location', tables['locations']),
+    ):
+        field = Post._meta.get_field(name)
+        for post in posts:
+            related_id = getattr(post, field.attname)
+            if related_id is None:
+                field.set_cached_value(post, None)
+            elif related_id in table:
+                field.set_cached_value(post, table[related_id])
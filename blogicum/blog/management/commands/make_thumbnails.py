@@ -0,0 +1,57 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from blog.images import make_variants
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт уменьшенные копии (card, detail, WebP) для уже '
+        'загруженных картинок публикаций.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Число процессов; по умолчанию по числу ядер.'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Пересоздать уже существующие копии.'
+        )
+
+    def handle(self, *args, workers, force, **options):
+        names = list(
+            Post.objects.exclude(image='').values_list('image', flat=True)
+        )
+        # Дочерним процессам не нужны унаследованные соединения с базой.
+        connections.close_all()
+        created = failed = 0
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                partial(_make_variants, force=force), names, chunksize=16
+            )
+            for name, result in zip(names, results):
+                if isinstance(result, Exception):
+                    failed += 1
+                    self.stderr.write(f'{name}: {result}')
+                else:
+                    created += result
+        self.stdout.write(self.style.SUCCESS(
+            f'Картинок: {len(names)}, создано копий: {created}, '
+            f'ошибок: {failed}'
+        ))
+
+
+def _make_variants(name, force):
+    try:
+        return make_variants(name, force=force)
+    except (OSError, ValueError) as error:
+        return error
@@ -0,0 +1,61 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from blog.jobs import claim_job, requeue_stale, run_job
+
+
+class Command(BaseCommand):
+    help = (
+        'Обработчик очереди картинок: проверяет загруженные файлы, '
+        'убирает EXIF и создаёт уменьшенные копии. Можно запускать '
+        'несколько обработчиков одновременно.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Разобрать очередь и завершиться.'
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=5,
+            help='Пауза в секундах, когда очередь пуста.'
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=3,
+            help='Сколько раз пробовать обработать картинку.'
+        )
+        parser.add_argument(
+            '--stale-after',
+            type=int,
+            default=10,
+            help='Через сколько минут вернуть в очередь зависшее задание.'
+        )
+
+    def handle(self, *args, once, sleep, max_attempts, stale_after,
+               **options):
+        stale = timedelta(minutes=stale_after)
+        done = failed = 0
+        while True:
+            requeue_stale(stale, max_attempts)
+            job = claim_job()
+            if job is None:
+                if once:
+                    break
+                time.sleep(sleep)
+                continue
+            if run_job(job, max_attempts):
+                done += 1
+                self.stdout.write(f'{job.image}: готово')
+            else:
+                failed += 1
+                self.stderr.write(f'{job.image}: {job.error}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано: {done}, ошибок: {failed}'
+        ))
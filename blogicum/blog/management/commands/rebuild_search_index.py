@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from blog.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = (
+        'Заново строит полнотекстовый индекс публикаций. Нужен после '
+        'массовых изменений в обход сигналов (bulk_create, '
+        'QuerySet.update, загрузка дампов).'
+    )
+
+    def handle(self, *args, **options):
+        rebuild_index()
+        self.stdout.write(self.style.SUCCESS('Индекс поиска перестроен.'))
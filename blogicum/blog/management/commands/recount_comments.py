@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+
+from blog.models import Post
+from blog.signals import recount_comments
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает счётчик комментариев у публикаций. Нужен после '
+        'массовых изменений комментариев в обход сигналов '
+        '(QuerySet.update, загрузка дампов).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Сколько публикаций обновлять одним запросом.'
+        )
+
+    def handle(self, *args, batch_size, **options):
+        last_id = Post.objects.aggregate(last_id=Max('pk'))['last_id'] or 0
+        updated = 0
+        for start in range(0, last_id + 1, batch_size):
+            updated += recount_comments(
+                Post.objects.filter(pk__gte=start, pk__lt=start + batch_size)
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано публикаций: {updated}')
+        )
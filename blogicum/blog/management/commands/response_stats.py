@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+
+from blog import views
+from blog.cache import (
+    RESPONSE_COUNTS_FLUSH_INTERVAL, ConditionalPageMixin,
+    flush_response_counts, reset_response_counts, response_counts
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает, сколько ответов 200 и 304 отдали страницы блога '
+        'и какую долю запросов закрыли условные ответы. Каждый процесс '
+        'сервера копит счётчики в памяти и с первым ответом после '
+        f'{RESPONSE_COUNTS_FLUSH_INTERVAL} с переносит их в общий кэш, '
+        'поэтому последние ответы могут ещё не попасть в вывод. '
+        'На FileBasedCache одновременный перенос из двух процессов '
+        'изредка теряет часть счёта; на Memcached счёт точный.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Обнулить счётчики после вывода.'
+        )
+
+    def handle(self, *args, reset, **options):
+        flush_response_counts()
+        names = sorted(
+            name for name, value in vars(views).items()
+            if isinstance(value, type)
+            and issubclass(value, ConditionalPageMixin)
+            and value is not ConditionalPageMixin
+        )
+        total = {200: 0, 304: 0}
+        for name in names:
+            counts = response_counts(name)
+            self.stdout.write(_line(name, counts))
+            for status in total:
+                total[status] += counts[status]
+            if reset:
+                reset_response_counts(name)
+        self.stdout.write(self.style.SUCCESS(_line('Всего', total)))
+
+
+def _line(name, counts):
+    requests = counts[200] + counts[304]
+    ratio = counts[304] / requests if requests else 0
+    return (
+        f'{name:<20} 200: {counts[200]:>8}  304: {counts[304]:>8}  '
+        f'доля 304: {ratio:.1%}'
+    )
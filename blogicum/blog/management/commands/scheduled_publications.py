@@ -0,0 +1,67 @@
+from urllib.error import HTTPError, URLError
+from urllib.request import urlopen
+
+from django.core.management.base import BaseCommand
+
+from blog.models import ScheduledPublication
+from blog.schedule import affected_urls, rebuild_schedule
+from blog.utils import goes_live_at, publication_boundary
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает отложенные публикации и страницы, которые изменятся '
+        'с их выходом. С --warm запрашивает по HTTP у работающего '
+        'сайта страницы вышедших публикаций, чтобы они попали в общий '
+        'кэш, и убирает публикации из расписания; удобно запускать '
+        'по cron раз в минуту.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--warm',
+            metavar='BASE_URL',
+            help=(
+                'Адрес сайта, например https://blogicum.example: '
+                'прогреть у него страницы вышедших публикаций.'
+            )
+        )
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Пересобрать расписание по таблице публикаций.'
+        )
+
+    def handle(self, *args, warm, rebuild, **options):
+        if rebuild:
+            total = rebuild_schedule()
+            self.stdout.write(f'В расписании публикаций: {total}')
+        schedule = ScheduledPublication.objects.select_related(
+            'post__author', 'post__category'
+        )
+        boundary = publication_boundary()
+        if warm:
+            self.warm(schedule.filter(pub_date__lte=boundary), warm)
+        for entry in schedule.filter(pub_date__gt=boundary):
+            self.stdout.write(
+                f'{goes_live_at(entry.pub_date):%Y-%m-%d %H:%M} '
+                f'«{entry.post}»: {", ".join(affected_urls(entry.post))}'
+            )
+
+    def warm(self, published, base_url):
+        urls = set()
+        for entry in published:
+            urls.update(affected_urls(entry.post))
+        for url in sorted(urls):
+            try:
+                with urlopen(base_url.rstrip('/') + url, timeout=30) as page:
+                    status = page.status
+            except HTTPError as error:
+                status = error.code
+            except URLError as error:
+                status = error.reason
+            self.stdout.write(f'{status} {url}')
+        published.delete()
+        self.stdout.write(
+            self.style.SUCCESS(f'Прогрето страниц: {len(urls)}')
+        )
@@ -0,0 +1,275 @@
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from functools import partial
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+from PIL import Image
+
+from blog.cache import bump_generation
+from blog.images import make_variants
+from blog.lookups import bump_lookups, bump_users
+from blog.models import Category, Comments, Location, Post
+from blog.schedule import rebuild_schedule
+from blog.search import rebuild_index
+from blog.signals import recount_comments
+
+User = get_user_model()
+
+WORDS = (
+    'утро', 'город', 'река', 'дорога', 'лес', 'поезд', 'море', 'книга',
+    'вечер', 'письмо', 'окно', 'мост', 'сад', 'ветер', 'гора', 'чай',
+    'новый', 'старый', 'тихий', 'яркий', 'долгий', 'первый', 'летний',
+    'идти', 'смотреть', 'писать', 'ждать', 'вспоминать', 'находить',
+)
+# Доли «особых» строк в выборке.
+UNPUBLISHED_SHARE = 0.05
+FUTURE_SHARE = 0.05
+IMAGE_SIZE = (1600, 1200)
+
+
+class Command(BaseCommand):
+    help = (
+        'Быстро наполняет базу тестовыми данными для нагрузочных '
+        'проверок и стендов: пользователи, категории, местоположения, '
+        'публикации (в том числе отложенные и скрытые) и комментарии. '
+        'Строки вставляются пачками через bulk_create; при одинаковом '
+        '--seed данные получаются одинаковыми при любом --workers.'
+    )
+
+    def add_arguments(self, parser):
+        for name, default in (
+            ('users', 100), ('categories', 10), ('locations', 20),
+            ('posts', 1000), ('comments', 5000),
+        ):
+            parser.add_argument(
+                f'--{name}', type=int, default=default,
+                help=f'Сколько добавить (по умолчанию {default}).'
+            )
+        parser.add_argument(
+            '--images',
+            type=int,
+            default=5,
+            help='Сколько разных картинок-заглушек создать; 0 — без них.'
+        )
+        parser.add_argument(
+            '--image-share',
+            type=float,
+            default=0.3,
+            help='Доля публикаций с картинкой.'
+        )
+        parser.add_argument(
+            '--prefix',
+            default='seed',
+            help='Префикс логинов и slug категорий; при повторном '
+            'наполнении той же базы задайте другой.'
+        )
+        parser.add_argument(
+            '--password',
+            default=None,
+            help='Пароль пользователей; по умолчанию войти нельзя.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Сколько строк вставлять одним запросом.'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Число процессов, готовящих строки; вставляет всегда '
+            'основной процесс.'
+        )
+
+    def handle(self, *args, **options):
+        needs_users = options['posts'] or options['comments']
+        if needs_users and not options['users'] or (
+            options['comments'] and not options['posts']
+        ):
+            raise CommandError(
+                'Публикациям нужны авторы, комментариям — ещё и публикации.'
+            )
+        self.options = options
+        prefix = options['prefix']
+        password = make_password(options['password'])
+        users = self.insert(User, options['users'], partial(
+            _user_rows, prefix=prefix, password=password
+        ))
+        categories = self.insert(
+            Category, options['categories'],
+            partial(_category_rows, prefix=prefix)
+        )
+        locations = self.insert(
+            Location, options['locations'], _location_rows
+        )
+        images = self.make_images(options['images'])
+        posts = self.insert(Post, options['posts'], partial(
+            _post_rows, now=timezone.now(), users=users,
+            categories=categories, locations=locations, images=images,
+            image_share=options['image_share'],
+        ))
+        self.insert(Comments, options['comments'], partial(
+            _comment_rows, users=users, posts=posts
+        ))
+        # bulk_create не шлёт сигналов: обновляем производные данные
+        # и сбрасываем кэши сами.
+        if posts:
+            recount_comments(
+                Post.objects.filter(pk__range=(posts[0], posts[-1]))
+            )
+        rebuild_schedule()
+        rebuild_index()
+        bump_lookups()
+        bump_users()
+        bump_generation()
+        self.stdout.write(self.style.SUCCESS('База наполнена.'))
+
+    def insert(self, model, total, make_rows):
+        """
+        Вставляет total строк пачками и возвращает диапазон их id.
+        Пачку готовит make_rows(seed, start, size) — в основном
+        процессе или в пуле, если задан --workers.
+        """
+        batch_size = self.options['batch_size']
+        starts = range(0, total, batch_size)
+        sizes = [min(batch_size, total - start) for start in starts]
+        seeds = [
+            f'{self.options["seed"]}:{model.__name__}:{start}'
+            for start in starts
+        ]
+        last_id = _last_id(model)
+        if self.options['workers'] > 1:
+            # Дочерним процессам не нужны унаследованные соединения.
+            connections.close_all()
+            executor = ProcessPoolExecutor(self.options['workers'])
+            batches = executor.map(make_rows, seeds, starts, sizes)
+        else:
+            executor = None
+            batches = map(make_rows, seeds, starts, sizes)
+        try:
+            for start, rows in zip(starts, batches):
+                with transaction.atomic():
+                    model.objects.bulk_create(model(**row) for row in rows)
+                self.stdout.write(
+                    f'{model._meta.verbose_name_plural}: '
+                    f'{start + len(rows)}/{total}'
+                )
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        # SQLite не возвращает id из bulk_create, но новые строки
+        # в пустой или единственной записывающей сессии идут подряд.
+        return range(last_id + 1, _last_id(model) + 1)
+
+    def make_images(self, count):
+        """Картинки-заглушки вместе с уменьшенными копиями."""
+        names = []
+        for number in range(count):
+            rng = random.Random(f'{self.options["seed"]}:image:{number}')
+            image = Image.new('RGB', IMAGE_SIZE, tuple(
+                rng.randrange(256) for _ in range(3)
+            ))
+            buffer = BytesIO()
+            image.save(buffer, 'JPEG', quality=85)
+            name = default_storage.save(
+                f'posts_images/{self.options["prefix"]}_{number}.jpeg',
+                ContentFile(buffer.getvalue())
+            )
+            make_variants(name)
+            names.append(name)
+        return names
+
+
+def _last_id(model):
+    return model.objects.aggregate(last_id=Max('pk'))['last_id'] or 0
+
+
+def _words(rng, count):
+    return ' '.join(rng.choice(WORDS) for _ in range(count))
+
+
+def _user_rows(seed, start, size, prefix, password):
+    rng = random.Random(seed)
+    return [
+        {
+            'username': f'{prefix}{number}',
+            'first_name': _words(rng, 1).capitalize(),
+            'last_name': _words(rng, 1).capitalize(),
+            'email': f'{prefix}{number}@example.com',
+            'password': password,
+        }
+        for number in range(start, start + size)
+    ]
+
+
+def _category_rows(seed, start, size, prefix):
+    rng = random.Random(seed)
+    return [
+        {
+            'title': _words(rng, 2).capitalize(),
+            'description': _words(rng, 12),
+            'slug': f'{prefix}-{number}',
+            'is_published': rng.random() >= UNPUBLISHED_SHARE,
+        }
+        for number in range(start, start + size)
+    ]
+
+
+def _location_rows(seed, start, size):
+    rng = random.Random(seed)
+    return [
+        {
+            'name': _words(rng, 2).capitalize(),
+            'is_published': rng.random() >= UNPUBLISHED_SHARE,
+        }
+        for _ in range(size)
+    ]
+
+
+def _post_rows(seed, start, size, now, users, categories, locations,
+               images, image_share):
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(size):
+        if rng.random() < FUTURE_SHARE:
+            delta = -timedelta(minutes=rng.randint(1, 60 * 24 * 30))
+        else:
+            delta = timedelta(minutes=rng.randint(0, 60 * 24 * 365 * 3))
+        rows.append({
+            'title': _words(rng, 4).capitalize(),
+            'text': _words(rng, rng.randint(20, 120)),
+            'pub_date': now - delta,
+            'is_published': rng.random() >= UNPUBLISHED_SHARE,
+            'author_id': rng.choice(users),
+            'category_id': rng.choice(categories) if categories else None,
+            'location_id': rng.choice(locations) if locations else None,
+            'image': (
+                rng.choice(images)
+                if images and rng.random() < image_share else ''
+            ),
+        })
+    return rows
+
+
+def _comment_rows(seed, start, size, users, posts):
+    rng = random.Random(seed)
+    return [
+        {
+            'text': _words(rng, rng.randint(3, 30)).capitalize(),
+            'author_id': rng.choice(users),
+            'post_id': rng.choice(posts),
+            'is_published': rng.random() >= UNPUBLISHED_SHARE,
+        }
+        for _ in range(size)
+    ]
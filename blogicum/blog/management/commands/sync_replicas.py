@@ -0,0 +1,40 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from blog.cache import get_generation, set_replica_generation
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в файлы реплик из '
+        'BLOGICUM_REPLICAS. Для локальной проверки чтения с реплик; '
+        'запускайте по cron, чтобы задать отставание реплик. '
+        'Поколение данных блога на момент копирования запоминается '
+        'для каждой реплики: под ним кэшируется прочитанное с неё.'
+    )
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError(
+                'Реплики не настроены: задайте BLOGICUM_REPLICAS.'
+            )
+        primary = connections['default']
+        if primary.vendor != 'sqlite':
+            raise CommandError('Команда копирует только базы SQLite.')
+        primary.ensure_connection()
+        for alias in settings.DATABASE_REPLICAS:
+            connections[alias].close()
+            # Поколение берётся до копирования: если запись успеет
+            # попасть в копию, реплика окажется новее своего поколения,
+            # но не старее.
+            generation = get_generation()
+            target = sqlite3.connect(connections[alias].settings_dict['NAME'])
+            try:
+                primary.connection.backup(target)
+            finally:
+                target.close()
+            set_replica_generation(alias, generation)
+            self.stdout.write(f'{alias}: скопирована основная база')
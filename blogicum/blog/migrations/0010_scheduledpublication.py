@@ -0,0 +1,40 @@
+# Generated by Django 3.2.16 on 2026-10-17 07:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def fill_schedule(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    ScheduledPublication = apps.get_model('blog', 'ScheduledPublication')
+    ScheduledPublication.objects.bulk_create(
+        ScheduledPublication(post_id=post_id, pub_date=pub_date)
+        for post_id, pub_date in Post.objects.filter(
+            is_published=True,
+            pub_date__gt=django.utils.timezone.now()
+        ).values_list('pk', 'pub_date').iterator()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduledPublication',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='schedule', serialize=False, to='blog.post', verbose_name='Публикация')),
+                ('pub_date', models.DateTimeField(db_index=True, verbose_name='Дата и время публикации')),
+            ],
+            options={
+                'verbose_name': 'отложенная публикация',
+                'verbose_name_plural': 'Отложенные публикации',
+                'ordering': ('pub_date',),
+            },
+        ),
+        migrations.RunPython(fill_schedule, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 3.2.16 on 2026-10-17 08:06
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_post_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imagejob',
+            name='not_before',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='Повторная попытка начнётся не раньше этого момента.', verbose_name='Не раньше'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils import timezone
 
 
 MAX_LEN = 256
@@ -10,7 +11,7 @@ User = get_user_model()
 class BaseModel(models.Model):
     """
     Абстрактная модель.
-    Добавляет к модели дату создания и
+    Добавляет к модели даты создания и изменения и
     критерий необходимости публикации.
     """
 
@@ -20,6 +21,7 @@ class BaseModel(models.Model):
         help_text='Снимите галочку, чтобы скрыть публикацию.'
     )
     created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+    updated_at = models.DateTimeField('Изменено', auto_now=True)
 
     class Meta:
         abstract = True
@@ -67,6 +69,9 @@ class Location(BaseModel):
 class Comments(BaseModel):
     """Модель, описывающая комментарий"""
 
+    # Комментарии не версионируются: кэш страниц сбрасывается
+    # сигналами, а своя дата изменения комментарию не нужна.
+    updated_at = None
     text = models.TextField('Текст комментария')
     post = models.ForeignKey(
         'Post',
@@ -84,11 +89,48 @@ class Comments(BaseModel):
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comments_post_created_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text
 
 
+class PostQuerySet(models.QuerySet):
+    """Запросы публикаций со связанными объектами из памяти процесса."""
+
+    _with_lookups = False
+
+    def with_lookups(self):
+        """
+        Не присоединять автора, категорию и местоположение в запросе,
+        а брать их из blog.lookups после выборки.
+        """
+        clone = self._chain()
+        clone._with_lookups = True
+        return clone
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._with_lookups = self._with_lookups
+        return clone
+
+    def _fetch_all(self):
+        fetched = self._result_cache is None
+        super()._fetch_all()
+        if (
+            fetched and self._with_lookups
+            and self._iterable_class is models.query.ModelIterable
+        ):
+            # lookups сам импортирует модели, поэтому импорт здесь.
+            from .lookups import fill_lookups
+            fill_lookups(self._result_cache)
+
+
 class Post(BaseModel):
     """Модель, описывающая структуру поста"""
 
@@ -121,11 +163,178 @@ class Post(BaseModel):
         verbose_name='Категория',
         related_name='posts'
     )
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False
+    )
+    image_ready = models.BooleanField(
+        'Картинка обработана',
+        default=True,
+        editable=False
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ['-pub_date']
+        indexes = (
+            # Лента, лента категории и чужой профиль показывают только
+            # опубликованные посты, поэтому индексы для них частичные.
+            models.Index(
+                fields=('-pub_date',),
+                condition=models.Q(is_published=True),
+                name='post_feed_idx'
+            ),
+            models.Index(
+                fields=('category', '-pub_date'),
+                condition=models.Q(is_published=True),
+                name='post_category_feed_idx'
+            ),
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='post_author_feed_idx'
+            ),
+        )
 
     def __str__(self):
         return self.title
+
+    # Служебные поля меняются только запросами update(),
+    # поэтому при обычном сохранении их устаревшие значения не пишем.
+    SERVICE_FIELDS = ('comment_count', 'image_ready')
+
+    def save(self, *args, **kwargs):
+        if (
+            not self._state.adding and self.pk is not None
+            and kwargs.get('update_fields') is None
+        ):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.SERVICE_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+
+class ScheduledPublication(models.Model):
+    """
+    Отложенная публикация.
+    Небольшая таблица будущих дат публикации: по ней кэши
+    узнают, когда их содержимое устареет.
+    """
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        verbose_name='Публикация',
+        related_name='schedule'
+    )
+    pub_date = models.DateTimeField(
+        'Дата и время публикации',
+        db_index=True
+    )
+
+    class Meta:
+        verbose_name = 'отложенная публикация'
+        verbose_name_plural = 'Отложенные публикации'
+        ordering = ('pub_date',)
+
+    def __str__(self):
+        return f'{self.post_id}: {self.pub_date}'
+
+
+class ImageJob(models.Model):
+    """
+    Задание на обработку картинки публикации.
+    Проверка, очистка EXIF и уменьшенные копии делаются
+    вне запроса командой process_image_jobs.
+    """
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Готово'),
+        (FAILED, 'Ошибка'),
+    )
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        verbose_name='Публикация',
+        related_name='image_jobs'
+    )
+    image = models.CharField('Файл', max_length=MAX_LEN)
+    status = models.CharField(
+        'Состояние',
+        max_length=16,
+        choices=STATUS_CHOICES,
+        default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField('Попытки', default=0)
+    not_before = models.DateTimeField(
+        'Не раньше',
+        default=timezone.now,
+        help_text='Повторная попытка начнётся не раньше этого момента.'
+    )
+    error = models.TextField('Ошибка', blank=True)
+    created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+    updated_at = models.DateTimeField('Изменено', auto_now=True)
+
+    class Meta:
+        verbose_name = 'обработка картинки'
+        verbose_name_plural = 'Обработка картинок'
+        ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('status', 'created_at'),
+                name='imagejob_queue_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.image}: {self.get_status_display()}'
+
+
+class MatchField(models.TextField):
+    """Скрытый столбец FTS5 с именем таблицы, слева от MATCH."""
+
+
+@MatchField.register_lookup
+class Match(models.Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', (*lhs_params, *rhs_params)
+
+
+class PostSearch(models.Model):
+    """
+    Строка полнотекстового индекса SQLite FTS5.
+    Таблицу создаёт миграция 0012 и наполняет blog.search;
+    модель нужна, чтобы соединять индекс с публикациями через ORM.
+    """
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        related_name='search_entry'
+    )
+    title = models.TextField()
+    text = models.TextField()
+    document = MatchField(db_column='blog_post_search')
+
+    class Meta:
+        managed = False
+        db_table = 'blog_post_search'
@@ -0,0 +1,205 @@
+import base64
+import binascii
+import datetime
+import hashlib
+import json
+from collections.abc import Sequence
+
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.core.paginator import InvalidPage, Page, Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from .cache import read_generation
+
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+COUNT_CACHE_TIMEOUT = 60 * 60
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """Сохраняет микросекунды, которые DjangoJSONEncoder отбрасывает."""
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(direction, values):
+    """Упаковывает направление и значения ключа в непрозрачный токен."""
+    payload = json.dumps([direction, list(values)], cls=CursorEncoder)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    padding = '=' * (-len(token) % 4)
+    try:
+        direction, values = json.loads(
+            base64.urlsafe_b64decode(token + padding)
+        )
+    except (binascii.Error, ValueError, TypeError):
+        raise InvalidCursor('Некорректный курсор')
+    if direction not in (NEXT, PREVIOUS) or not isinstance(values, list):
+        raise InvalidCursor('Некорректный курсор')
+    return direction, values
+
+
+class KeysetPage(Sequence):
+    """Страница, полученная по курсору, а не по номеру."""
+
+    is_keyset = True
+
+    def __init__(self, object_list, paginator, next_cursor=None,
+                 previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<Keyset page of {len(self.object_list)} items>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Пагинатор по ключу сортировки.
+    Вместо OFFSET продолжает выборку после последней строки страницы,
+    поэтому глубокие страницы стоят столько же, сколько первая,
+    и COUNT(*) не выполняется.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-pub_date', '-id')):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = [name.lstrip('-') for name in self.ordering]
+
+    def _field(self, name):
+        # Сортировать можно и по аннотации, например по оценке поиска.
+        annotation = self.queryset.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        return self.queryset.model._meta.get_field(name)
+
+    def _to_python(self, values):
+        if len(values) != len(self.fields):
+            raise InvalidCursor('Некорректный курсор')
+        try:
+            return [
+                self._field(name).to_python(value)
+                for name, value in zip(self.fields, values)
+            ]
+        except ValidationError:
+            raise InvalidCursor('Некорректный курсор')
+
+    def _key(self, row):
+        if isinstance(row, dict):
+            return [row[name] for name in self.fields]
+        return [getattr(row, name) for name in self.fields]
+
+    def _seek(self, values, forward):
+        """Условие «строго после/до» ключа для лексикографического порядка."""
+        condition = Q()
+        equal = {}
+        for order, name, value in zip(self.ordering, self.fields, values):
+            descending = order.startswith('-')
+            lookup = 'lt' if descending == forward else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    def _reversed_ordering(self):
+        return [
+            name[1:] if name.startswith('-') else f'-{name}'
+            for name in self.ordering
+        ]
+
+    def get_page(self, cursor=None):
+        queryset = self.queryset
+        direction = NEXT
+        if cursor:
+            direction, values = decode_cursor(cursor)
+            queryset = queryset.filter(
+                self._seek(self._to_python(values), direction == NEXT)
+            )
+        if direction == NEXT:
+            queryset = queryset.order_by(*self.ordering)
+        else:
+            queryset = queryset.order_by(*self._reversed_ordering())
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if direction == PREVIOUS:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, bool(cursor)
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = encode_cursor(NEXT, self._key(rows[-1]))
+        if rows and has_previous:
+            previous_cursor = encode_cursor(PREVIOUS, self._key(rows[0]))
+        return KeysetPage(rows, self, next_cursor, previous_cursor)
+
+
+class WindowPage(Page):
+
+    @property
+    def page_window(self):
+        """Номера соседних страниц и края ленты, остальное — «…»."""
+        return self.paginator.get_elided_page_range(
+            self.number, on_each_side=2, on_ends=1
+        )
+
+
+class WindowPaginator(Paginator):
+    """
+    Постраничный вывод лент.
+    COUNT(*) выполняется один раз на поколение данных блога,
+    а в шаблон попадает только окно номеров страниц.
+    """
+
+    @cached_property
+    def count(self):
+        try:
+            sql = str(self.object_list.query)
+        except (AttributeError, EmptyResultSet):
+            return super().count
+        digest = hashlib.md5(sql.encode()).hexdigest()
+        # Число с реплики хранится под её поколением данных.
+        generation = read_generation()
+        if generation is None:
+            return self.object_list.count()
+        key = f'blog:count:{generation}:{digest}'
+        count = cache.get(key)
+        if count is None:
+            count = self.object_list.count()
+            cache.set(key, count, COUNT_CACHE_TIMEOUT)
+        return count
+
+    def _get_page(self, *args, **kwargs):
+        return WindowPage(*args, **kwargs)
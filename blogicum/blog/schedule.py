@@ -0,0 +1,53 @@
+from django.db.models import Min
+from django.urls import reverse
+
+from .models import Post, ScheduledPublication
+from .utils import goes_live_at, publication_boundary
+
+
+def sync_schedule(post):
+    """Держит в таблице только будущие опубликованные посты."""
+    if post.is_published and post.pub_date > publication_boundary():
+        ScheduledPublication.objects.update_or_create(
+            post_id=post.pk,
+            defaults={'pub_date': post.pub_date}
+        )
+    else:
+        ScheduledPublication.objects.filter(post_id=post.pk).delete()
+
+
+def rebuild_schedule():
+    ScheduledPublication.objects.all().delete()
+    ScheduledPublication.objects.bulk_create(
+        (
+            ScheduledPublication(post_id=post_id, pub_date=pub_date)
+            for post_id, pub_date in Post.objects.filter(
+                is_published=True,
+                pub_date__gt=publication_boundary()
+            ).values_list('pk', 'pub_date').iterator()
+        ),
+        batch_size=1000
+    )
+    return ScheduledPublication.objects.count()
+
+
+def next_go_live():
+    """Момент выхода ближайшей отложенной публикации или None."""
+    pub_date = ScheduledPublication.objects.filter(
+        pub_date__gt=publication_boundary()
+    ).aggregate(next=Min('pub_date'))['next']
+    return goes_live_at(pub_date) if pub_date else None
+
+
+def affected_urls(post):
+    """Страницы, содержимое которых меняется при выходе поста."""
+    urls = [
+        reverse('blog:index'),
+        reverse('blog:post_detail', args=(post.pk,)),
+        reverse('blog:profile', args=(post.author.username,)),
+    ]
+    if post.category is not None:
+        urls.append(
+            reverse('blog:category_posts', args=(post.category.slug,))
+        )
+    return urls
@@ -0,0 +1,97 @@
+import re
+
+from django.db import connections, router
+from django.db.models import FloatField
+from django.db.models.expressions import RawSQL
+
+from .models import Post, PostSearch
+
+# Полнотекстовый индекс SQLite FTS5, создаётся миграцией 0012.
+SEARCH_TABLE = 'blog_post_search'
+# Совпадение в заголовке весит больше, чем в тексте.
+RANK = f'bm25({SEARCH_TABLE}, 10.0, 1.0)'
+
+WORD = re.compile(r'\w+')
+
+
+def is_supported(connection):
+    return connection.vendor == 'sqlite'
+
+
+def match_expression(query):
+    """
+    Запрос пользователя в синтаксисе FTS5: каждое слово в кавычках
+    (операторы и скобки FTS5 не работают) и с поиском по началу,
+    чтобы находились и другие формы слова.
+    """
+    return ' '.join(f'"{word}"*' for word in WORD.findall(query.lower()))
+
+
+def search_posts(queryset, query):
+    """
+    Публикации из queryset, подходящие под запрос, с оценкой rank:
+    чем она меньше, тем выше результат. Индекс присоединяется
+    через PostSearch, поэтому rank годится для сортировки и курсоров.
+    """
+    queryset = queryset.annotate(
+        rank=RawSQL(RANK, (), output_field=FloatField())
+    )
+    expression = match_expression(query)
+    if not expression:
+        return queryset.none()
+    return queryset.filter(search_entry__document__match=expression)
+
+
+def matching_ids(query):
+    """Подзапрос id подходящих публикаций, для фильтра pk__in."""
+    return PostSearch.objects.filter(
+        document__match=match_expression(query) or '""'
+    ).values('post_id')
+
+
+def _cursor():
+    connection = connections[router.db_for_write(Post)]
+    if not is_supported(connection):
+        return None
+    return connection.cursor()
+
+
+def index_post(post):
+    cursor = _cursor()
+    if cursor is None:
+        return
+    with cursor:
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', (post.pk,)
+        )
+        cursor.execute(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, title, text) '
+            'VALUES (%s, %s, %s)',
+            (post.pk, post.title, post.text)
+        )
+
+
+def unindex_post(post_id):
+    cursor = _cursor()
+    if cursor is None:
+        return
+    with cursor:
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', (post_id,)
+        )
+
+
+def rebuild_index():
+    """Заново индексирует все публикации, например после bulk_create."""
+    cursor = _cursor()
+    if cursor is None:
+        return
+    with cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, title, text) '
+            f'SELECT id, title, text FROM {Post._meta.db_table}'
+        )
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')"
+        )
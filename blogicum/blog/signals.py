@@ -0,0 +1,133 @@
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .cache import bump_generation
+from .jobs import enqueue_image
+from .lookups import USER_FIELDS, User, bump_lookups, bump_users
+from .models import Category, Comments, Location, Post
+from .schedule import sync_schedule
+from .search import index_post, unindex_post
+
+
+def recount_comments(posts=None):
+    """Пересчитывает Post.comment_count по опубликованным комментариям."""
+    published = Comments.objects.filter(
+        post=OuterRef('pk'),
+        is_published=True
+    ).order_by().values('post').annotate(total=Count('pk')).values('total')
+    if posts is None:
+        posts = Post.objects.all()
+    return posts.update(comment_count=Coalesce(Subquery(published), 0))
+
+
+def change_comment_count(post_id, delta):
+    Post.objects.filter(pk=post_id).update(
+        comment_count=F('comment_count') + delta
+    )
+
+
+def _counted_state(comment):
+    """Пост, в счётчике которого учтён комментарий, или None."""
+    if {'post_id', 'is_published'} - comment.__dict__.keys():
+        return ...
+    return comment.post_id if comment.is_published else None
+
+
+@receiver(post_init, sender=Comments)
+def remember_comment_state(sender, instance, **kwargs):
+    instance._counted_in = _counted_state(instance)
+
+
+@receiver(post_save, sender=Comments)
+def update_comment_count_on_save(sender, instance, created, **kwargs):
+    old = None if created else instance._counted_in
+    new = _counted_state(instance)
+    if old is ... or new is ...:
+        # Поля были отложены (only/defer): состояние до сохранения
+        # неизвестно, поэтому пересчитываем пост целиком.
+        recount_comments(Post.objects.filter(pk=instance.post_id))
+    elif old != new:
+        if old is not None:
+            change_comment_count(old, -1)
+        if new is not None:
+            change_comment_count(new, 1)
+    instance._counted_in = new
+
+
+@receiver(post_delete, sender=Comments)
+def update_comment_count_on_delete(sender, instance, **kwargs):
+    if instance._counted_in is ...:
+        recount_comments(Post.objects.filter(pk=instance.post_id))
+    elif instance._counted_in is not None:
+        change_comment_count(instance._counted_in, -1)
+
+
+def _image_name(post):
+    return post.image.name if 'image' in post.__dict__ else ...
+
+
+@receiver(post_init, sender=Post)
+def remember_image(sender, instance, **kwargs):
+    instance._image_name = _image_name(instance)
+
+
+@receiver(post_save, sender=Post)
+def queue_image_processing(sender, instance, created, raw=False, **kwargs):
+    name = _image_name(instance)
+    if (
+        not raw and name and name is not ...
+        and (created or name != instance._image_name)
+    ):
+        enqueue_image(instance)
+    instance._image_name = name
+
+
+@receiver(post_save, sender=Post)
+def update_schedule(sender, instance, raw=False, **kwargs):
+    if not raw:
+        sync_schedule(instance)
+
+
+@receiver(post_save, sender=Post)
+def update_search_index(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or {'title', 'text'} & set(update_fields):
+        index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_search_index(sender, instance, **kwargs):
+    unindex_post(instance.pk)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Location)
+def invalidate_lookups(sender, **kwargs):
+    bump_lookups()
+    # Другой процесс мог перечитать таблицы до фиксации транзакции.
+    transaction.on_commit(bump_lookups)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_users(sender, update_fields=None, **kwargs):
+    # Вход пользователя сохраняет только last_login: сводку не трогаем.
+    if update_fields is None or set(update_fields) & set(USER_FIELDS):
+        bump_users()
+        transaction.on_commit(bump_users)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comments)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comments)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Location)
+def invalidate_page_cache(sender, **kwargs):
+    bump_generation()
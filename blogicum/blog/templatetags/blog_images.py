@@ -0,0 +1,21 @@
+from django import template
+from django.templatetags.static import static
+
+from blog.images import variant_url
+
+register = template.Library()
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post, variant):
+    """Картинка поста в нужном размере, с WebP для поддерживающих его."""
+    if not post.image_ready:
+        # Картинка ещё в очереди на обработку или не прошла проверку.
+        return {'src': static('blog/img/placeholder.svg')}
+    # Если из-за сбоя хранилища копии не создались,
+    # variant_url отдаёт адрес оригинала.
+    return {
+        'original': post.image.url,
+        'src': variant_url(post.image, variant),
+        'webp': variant_url(post.image, variant, 'webp', fallback=False),
+    }
@@ -0,0 +1,37 @@
+from django import template
+
+register = template.Library()
+
+
+class AuthorOnlyNode(template.Node):
+
+    def __init__(self, author_id, nodelist):
+        self.author_id = author_id
+        self.nodelist = nodelist
+
+    def render(self, context):
+        author_id = self.author_id.resolve(context)
+        if context.get('page_overlay'):
+            # Общая страница: кому показать блок, решит apply_overlay.
+            return (
+                f'<!--author:{author_id}-->'
+                f'{self.nodelist.render(context)}<!--/author-->'
+            )
+        user = context.get('user')
+        if user is not None and user.pk == author_id:
+            return self.nodelist.render(context)
+        return ''
+
+
+@register.tag
+def ifauthor(parser, token):
+    """Блок только для автора: {% ifauthor post.author_id %}."""
+    try:
+        _, author_id = token.split_contents()
+    except ValueError:
+        raise template.TemplateSyntaxError(
+            'ifauthor ожидает один аргумент: id автора'
+        )
+    nodelist = parser.parse(('endifauthor',))
+    parser.delete_first_token()
+    return AuthorOnlyNode(parser.compile_filter(author_id), nodelist)
@@ -1,6 +1,7 @@
 from django.urls import include, path
+from django.utils.feedgenerator import Atom1Feed
 
-from . import views
+from . import api, feeds, views
 
 app_name = 'blog'
 
@@ -25,6 +26,11 @@ post_urls = [
         views.PostDetailView.as_view(),
         name='post_detail'
     ),
+    path(
+        '<int:post_id>/comments/',
+        views.PostCommentsView.as_view(),
+        name='post_comments'
+    ),
     path(
         '<int:post_id>/comment/',
         views.add_comment,
@@ -43,14 +49,76 @@ post_urls = [
 
 ]
 
+feed_urls = [
+    path('feed/rss/', feeds.PostsFeed(), name='feed_rss'),
+    path('feed/atom/', feeds.PostsFeed(Atom1Feed), name='feed_atom'),
+    path(
+        'category/<slug:category_slug>/feed/rss/',
+        feeds.CategoryFeed(),
+        name='category_feed_rss'
+    ),
+    path(
+        'category/<slug:category_slug>/feed/atom/',
+        feeds.CategoryFeed(Atom1Feed),
+        name='category_feed_atom'
+    ),
+    path(
+        'profile/<username>/feed/rss/',
+        feeds.ProfileFeed(),
+        name='profile_feed_rss'
+    ),
+    path(
+        'profile/<username>/feed/atom/',
+        feeds.ProfileFeed(Atom1Feed),
+        name='profile_feed_atom'
+    ),
+]
+
+api_urls = [
+    path('posts/', api.PostListApiView.as_view(), name='api_posts'),
+    path(
+        'posts/batch/',
+        api.PostBatchApiView.as_view(),
+        name='api_posts_batch'
+    ),
+    path(
+        'posts/<int:post_id>/',
+        api.PostApiView.as_view(),
+        name='api_post'
+    ),
+    path(
+        'posts/<int:post_id>/comments/',
+        api.CommentListApiView.as_view(),
+        name='api_comments'
+    ),
+    path(
+        'categories/',
+        api.CategoryListApiView.as_view(),
+        name='api_categories'
+    ),
+    path(
+        'categories/<slug:category_slug>/',
+        api.CategoryApiView.as_view(),
+        name='api_category'
+    ),
+    path(
+        'profiles/<username>/',
+        api.ProfileApiView.as_view(),
+        name='api_profile'
+    ),
+]
+
 urlpatterns = [
     path('', views.PostListView.as_view(), name='index'),
+    path('', include(feed_urls)),
+    path('api/v1/', include(api_urls)),
     path('posts/', include(post_urls)),
     path(
         'category/<slug:category_slug>/',
         views.CategoryListView.as_view(),
         name='category_posts'
     ),
+    path('search/', views.SearchView.as_view(), name='search'),
     path(
         'profile/<username>/',
         views.ProfileListView.as_view(),
@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+
+PUBLICATION_STEP = timedelta(minutes=1)
+
+
+def publication_boundary():
+    """
+    Граница видимости отложенных публикаций.
+    Текущий момент округляется вниз до минуты, чтобы запросы,
+    сделанные в пределах одной минуты, совпадали и их результаты
+    можно было делить через кэш.
+    """
+    return timezone.now().replace(second=0, microsecond=0)
+
+
+def goes_live_at(pub_date):
+    """Момент, с которого граница видимости покрывает pub_date."""
+    boundary = pub_date.replace(second=0, microsecond=0)
+    return boundary if boundary == pub_date else boundary + PUBLICATION_STEP
@@ -1,68 +1,131 @@
-from datetime import datetime
-
+from django.conf import settings
+from django.db.models import BooleanField, ExpressionWrapper, Q
 from django.http import Http404
 from django.views.generic import (
     CreateView, DeleteView, DetailView, ListView, UpdateView
 )
-from django.db.models import Count
-from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse_lazy
+from django.utils.http import urlencode
 
-from .models import Category, Comments, Post
+from .cache import ConditionalPageMixin, PageCacheMixin
+from .models import Comments, Post
 from .forms import CommentsForm, PostForm
+from .lookups import (
+    published_category, unpublished_category_ids, user_by_username
+)
+from .paginators import InvalidCursor, KeysetPaginator, WindowPaginator
+from .search import search_posts
+from .utils import publication_boundary
 from users.models import MyUser
 from users.forms import CustomUserCreationForm
 
 
 POSTS_NUM = 10
 
-ADD_FILTER = True
-ADD_COMMENTS = True
-
+COMMENTS_NUM = 20
 
-User = get_user_model()
+ADD_FILTER = True
 
 
-def get_posts(add_filter=False, add_comments=False):
-    queryset = Post.objects.select_related(
-        'category', 'location', 'author'
-    )
+def get_posts(add_filter=False):
+    queryset = Post.objects.with_lookups()
     if add_filter:
-        queryset = queryset.filter(
-            is_published=True,
-            category__is_published=True,
-            pub_date__lte=datetime.now()
-        )
-    if add_comments:
-        queryset = queryset.annotate(comment_count=Count('comments'))
+        queryset = queryset.filter(public_posts_q())
     queryset = queryset.order_by(
         '-pub_date'
     )
     return queryset
 
 
-class OnlyAuthorMixin(UserPassesTestMixin):
+def public_posts_q():
+    """Условие для постов, которые видны всем читателям."""
+    condition = Q(
+        is_published=True,
+        category__isnull=False,
+        pub_date__lte=publication_boundary()
+    )
+    hidden_categories = unpublished_category_ids()
+    if hidden_categories:
+        condition &= ~Q(category__in=hidden_categories)
+    return condition
+
+
+def visible_posts_q(user):
+    """
+    Условие видимости поста для читателя: опубликованные посты видны
+    всем, а автору — ещё и свои скрытые и отложенные.
+    """
+    if user.is_authenticated:
+        return public_posts_q() | Q(author_id=user.pk)
+    return public_posts_q()
+
+
+def published_comments(post_id):
+    """
+    Комментарии поста, которые видят читатели на странице и в API;
+    их же считает Post.comment_count.
+    """
+    return Comments.objects.filter(post_id=post_id, is_published=True)
+
+
+class ObjectCacheMixin:
+    """Запоминает объект, чтобы не запрашивать его повторно за запрос."""
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_object'):
+            self._object = super().get_object()
+        return self._object
+
+
+class OnlyAuthorMixin(ObjectCacheMixin, UserPassesTestMixin):
 
     def test_func(self):
-        object = self.get_object()
-        return object.author == self.request.user
+        return self.get_object().author_id == self.request.user.pk
 
     def handle_no_permission(self):
-        object = self.get_object()
         return redirect(
             'blog:post_detail',
-            object.pk
+            self.kwargs['post_id']
         )
 
 
-class PostListView(ListView):
-    queryset = get_posts(ADD_FILTER, ADD_COMMENTS)
+class KeysetPaginationMixin:
+    cursor_kwarg = 'cursor'
+    keyset_ordering = ('-pub_date', '-id')
+
+    def uses_keyset_pagination(self):
+        return (
+            settings.POSTS_PAGINATION == 'keyset'
+            or self.cursor_kwarg in self.request.GET
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.uses_keyset_pagination():
+            return super().paginate_queryset(queryset, page_size)
+        paginator = KeysetPaginator(queryset, page_size, self.keyset_ordering)
+        try:
+            page = paginator.get_page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor as error:
+            raise Http404(error)
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+
+class PostListView(
+    ConditionalPageMixin, PageCacheMixin, KeysetPaginationMixin, ListView
+):
+    read_from_replica = True
     paginate_by = POSTS_NUM
+    paginator_class = WindowPaginator
     template_name = 'blog/index.html'
 
+    def get_queryset(self):
+        return get_posts(ADD_FILTER)
+
 
 class PostCreateView(LoginRequiredMixin, CreateView):
     model = Post
@@ -94,14 +157,14 @@ class PostUpdateView(OnlyAuthorMixin, UpdateView):
 
 
 class PostDeleteView(OnlyAuthorMixin, DeleteView):
-    model = Post
+    queryset = Post.objects.select_related('location')
     pk_url_kwarg = 'post_id'
     template_name = 'blog/create.html'
     context_object_name = 'form'
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        form = PostForm(instance=self.get_object())
+        form = PostForm(instance=self.object)
         context['form'] = form
         return context
 
@@ -111,44 +174,73 @@ class PostDeleteView(OnlyAuthorMixin, DeleteView):
         )
 
 
-class PostDetailView(DetailView):
-    model = Post
+class PostDetailView(
+    ConditionalPageMixin, PageCacheMixin, ObjectCacheMixin, DetailView
+):
+    read_from_replica = True
     pk_url_kwarg = 'post_id'
     pk_field = 'post_id'
     template_name = 'blog/detail.html'
 
+    def get_queryset(self):
+        return get_posts().filter(
+            visible_posts_q(self.request.user)
+        ).annotate(
+            is_public=ExpressionWrapper(
+                public_posts_q(), output_field=BooleanField()
+            )
+        )
+
     def get_object(self):
         object = super().get_object()
-        date_now = datetime.now().date()
-        is_author = object.author != self.request.user
-        is_pub = object.is_published is False
-        is_cat_is_pub = object.category.is_published is False
-        check_date = date_now < object.pub_date.date()
-        if ((is_author) & (is_pub or is_cat_is_pub or check_date)):
-            raise Http404
+        self.is_public = object.is_public
         return object
 
+    def is_page_shared(self):
+        # Скрытый пост видит только автор: его страницу не кэшируем.
+        return self.is_public
+
+    def get_comments(self):
+        paginator = KeysetPaginator(
+            published_comments(self.object.pk).select_related('author'),
+            COMMENTS_NUM,
+            ('created_at', 'id')
+        )
+        try:
+            return paginator.get_page(self.request.GET.get('cursor'))
+        except InvalidCursor as error:
+            raise Http404(error)
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['comments'] = self.get_object().comments.all()
+        context['comments'] = self.get_comments()
         context['form'] = CommentsForm()
         return context
 
 
-class CategoryListView(ListView):
+class PostCommentsView(PostDetailView):
+    """Следующая порция комментариев для кнопки «Показать ещё»."""
+
+    template_name = 'includes/comment_list.html'
+
+
+class CategoryListView(
+    ConditionalPageMixin, PageCacheMixin, KeysetPaginationMixin, ListView
+):
+    read_from_replica = True
     slug_url_kwarg = 'category_slug'
     paginate_by = POSTS_NUM
+    paginator_class = WindowPaginator
     template_name = 'blog/category.html'
 
     def get_category(self):
-        return get_object_or_404(
-            Category,
-            slug=self.kwargs['category_slug'],
-            is_published=True,
-        )
+        category = published_category(self.kwargs['category_slug'])
+        if category is None:
+            raise Http404
+        return category
 
     def get_queryset(self):
-        queryset = get_posts(ADD_FILTER, ADD_COMMENTS).filter(
+        queryset = get_posts(ADD_FILTER).filter(
             category=self.get_category()
         )
         return queryset
@@ -160,17 +252,50 @@ class CategoryListView(ListView):
         return context
 
 
-class ProfileListView(ListView):
+class SearchView(KeysetPaginationMixin, ListView):
+    """Поиск по заголовкам и текстам, лучшие совпадения сверху."""
+
+    read_from_replica = True
+    paginate_by = POSTS_NUM
+    keyset_ordering = ('rank', 'id')
+    template_name = 'blog/search.html'
+
+    def uses_keyset_pagination(self):
+        # Номера страниц потребовали бы COUNT(*) по всем совпадениям.
+        return True
+
+    def get_query(self):
+        return self.request.GET.get('q', '').strip()
+
+    def get_queryset(self):
+        return search_posts(get_posts(ADD_FILTER), self.get_query())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.get_query()
+        context['pagination_query'] = urlencode({'q': context['query']})
+        return context
+
+
+class ProfileListView(
+    ConditionalPageMixin, KeysetPaginationMixin, ListView
+):
+    read_from_replica = True
     slug_url_kwarg = 'username'
     paginate_by = POSTS_NUM
+    paginator_class = WindowPaginator
     template_name = 'blog/profile.html'
 
     def get_profile(self):
-        return get_object_or_404(User, username=self.kwargs['username'])
+        if not hasattr(self, '_profile'):
+            self._profile = user_by_username(self.kwargs['username'])
+        if self._profile is None:
+            raise Http404
+        return self._profile
 
     def get_queryset(self):
         profile = self.get_profile()
-        return get_posts(self.request.user != profile, ADD_COMMENTS).filter(
+        return get_posts(self.request.user != profile).filter(
             author=profile
         )
 
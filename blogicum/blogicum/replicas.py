@@ -0,0 +1,77 @@
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+
+
+# Псевдоним реплики, из которой читает текущий запрос.
+_read_alias = ContextVar('read_alias', default=None)
+
+PIN_SESSION_KEY = 'primary_until'
+
+# Сессии меняются на каждом входе, их всегда читаем с основной базы.
+PRIMARY_ONLY_APPS = {'sessions'}
+
+
+def read_alias():
+    return _read_alias.get()
+
+
+class ReplicaRouter:
+    """
+    Отправляет чтение на реплику, выбранную ReplicaMiddleware,
+    а запись и всё остальное — на основную базу.
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in PRIMARY_ONLY_APPS:
+            return 'default'
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Реплики получают схему вместе с данными из основной базы.
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaMiddleware:
+    """
+    Читает с реплик для представлений с read_from_replica = True.
+    После записи сессия на REPLICA_PIN_SECONDS закрепляется за основной
+    базой, чтобы автор сразу видел свой пост или комментарий.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _read_alias.set(None)
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+        if request.method not in ('GET', 'HEAD', 'OPTIONS') and (
+            settings.DATABASE_REPLICAS
+            and response.status_code < 400
+            and hasattr(request, 'session')
+        ):
+            request.session[PIN_SESSION_KEY] = (
+                time.time() + settings.REPLICA_PIN_SECONDS
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', None)
+        if (
+            settings.DATABASE_REPLICAS
+            and request.method in ('GET', 'HEAD')
+            and getattr(view_class, 'read_from_replica', False)
+            and request.session.get(PIN_SESSION_KEY, 0) < time.time()
+        ):
+            _read_alias.set(random.choice(settings.DATABASE_REPLICAS))
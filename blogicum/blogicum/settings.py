@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 
@@ -34,6 +35,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'blogicum.replicas.ReplicaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -65,11 +67,71 @@ WSGI_APPLICATION = 'blogicum.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'ENGINE': 'blogicum.sqlite',
+        'NAME': os.environ.get('BLOGICUM_DB', BASE_DIR / 'db.sqlite3'),
     }
 }
 
+# PRAGMA statements the blogicum.sqlite backend runs on every new
+# connection (see blogicum/settings_production.py)
+
+SQLITE_PRAGMAS = {}
+
+
+# Read replicas: comma-separated SQLite files in BLOGICUM_REPLICAS,
+# kept in sync with `manage.py sync_replicas`
+
+DATABASE_REPLICAS = []
+
+for number, path in enumerate(
+    filter(None, os.environ.get('BLOGICUM_REPLICAS', '').split(',')), 1
+):
+    DATABASES[f'replica{number}'] = {
+        'ENGINE': 'blogicum.sqlite',
+        'NAME': path,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['blogicum.replicas.ReplicaRouter']
+
+# Seconds a session keeps reading from the primary after a write
+
+REPLICA_PIN_SECONDS = 10
+
+
+# Cache shared by all server processes: cache generations and lookup
+# versions are bumped in one worker and must be seen by the others.
+# BLOGICUM_MEMCACHED=host:port selects Memcached (needs pymemcache),
+# otherwise the cache lives in a directory (BLOGICUM_CACHE_DIR).
+# Keys without an explicit timeout never expire.
+
+if os.environ.get('BLOGICUM_MEMCACHED'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': os.environ['BLOGICUM_MEMCACHED'],
+            'TIMEOUT': None,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get(
+                'BLOGICUM_CACHE_DIR', BASE_DIR / 'cache'
+            ),
+            'TIMEOUT': None,
+            'OPTIONS': {
+                'MAX_ENTRIES': 10000,
+            },
+        }
+    }
+
+# Lifetime (seconds) of whole pages cached for anonymous readers
+
+PAGE_CACHE_TIMEOUT = 60 * 5
+
 
 # Password validation
 
@@ -144,3 +206,8 @@ CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
 # Directory for media
 
 MEDIA_ROOT = BASE_DIR / 'media'
+
+
+# Post feeds pagination: 'offset' (numbered pages) or 'keyset' (cursors)
+
+POSTS_PAGINATION = 'offset'
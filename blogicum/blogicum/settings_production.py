@@ -0,0 +1,60 @@
+"""
+Профиль для нескольких процессов gunicorn на одной базе SQLite.
+
+    DJANGO_SETTINGS_MODULE=blogicum.settings_production
+    DJANGO_SECRET_KEY=...
+    DJANGO_ALLOWED_HOSTS=blogicum.example,www.blogicum.example
+
+WAL позволяет читать во время записи, busy_timeout заставляет писателя
+ждать блокировку вместо ошибки «database is locked», а CONN_MAX_AGE
+сохраняет соединение между запросами. Сравнение с настройками
+по умолчанию: benchmarks/sqlite_tuning.py.
+"""
+import os
+from copy import deepcopy
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .settings import *  # noqa: F401, F403
+from .settings import DATABASES
+
+
+def required_env(name):
+    try:
+        return os.environ[name]
+    except KeyError:
+        raise ImproperlyConfigured(
+            f'Задайте переменную окружения {name}.'
+        ) from None
+
+
+DEBUG = False
+
+SECRET_KEY = required_env('DJANGO_SECRET_KEY')
+
+ALLOWED_HOSTS = required_env('DJANGO_ALLOWED_HOSTS').split(',')
+
+DATABASES = deepcopy(DATABASES)
+
+# Seconds to keep a connection open between requests
+
+CONN_MAX_AGE = 600
+
+# Seconds a writer waits for the lock (busy_timeout)
+
+SQLITE_TIMEOUT = 20
+
+for database in DATABASES.values():
+    database['CONN_MAX_AGE'] = CONN_MAX_AGE
+    database.setdefault('OPTIONS', {})['timeout'] = SQLITE_TIMEOUT
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    # С WAL синхронизация при каждой фиксации не нужна для целостности.
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    # Отрицательное значение — размер кэша страниц в КиБ.
+    'cache_size': -64 * 1024,
+    'busy_timeout': SQLITE_TIMEOUT * 1000,
+    'temp_store': 'MEMORY',
+}
@@ -0,0 +1,6 @@
+"""
+Бэкенд SQLite проекта: ENGINE = 'blogicum.sqlite'.
+
+Отличается от стандартного только тем, что каждое новое соединение
+настраивается по settings.SQLITE_PRAGMAS.
+"""
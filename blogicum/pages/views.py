@@ -3,10 +3,12 @@ from django.views.generic import TemplateView
 
 
 class About(TemplateView):
+    read_from_replica = True
     template_name = 'pages/about.html'
 
 
 class Rules(TemplateView):
+    read_from_replica = True
     template_name = 'pages/rules.html'
 
 
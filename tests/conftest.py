@@ -41,6 +41,32 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(scope="session", autouse=True)
+def cache_dir(tmp_path_factory):
+    """
+    Кэш тестов лежит во временном каталоге, а не в кэше проекта:
+    очистка перед каждым тестом не должна стирать кэш сервера
+    разработки из того же каталога. Переменная окружения нужна
+    процессам, которые запускают сами тесты.
+    """
+    from django.conf import settings
+
+    location = str(tmp_path_factory.mktemp("cache"))
+    caches = {"default": {**settings.CACHES["default"], "LOCATION": location}}
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv("BLOGICUM_CACHE_DIR", location)
+        with override_settings(CACHES=caches):
+            yield location
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(cache_dir):
+    from django.core.cache import cache
+
+    cache.clear()
+    yield
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -363,6 +389,8 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".jpeg")
+                    or filename.endswith(".webp")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
@@ -0,0 +1,172 @@
+from datetime import timedelta
+
+import pytest
+from django.db.models.signals import post_init
+from django.utils import timezone
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def api_posts(mixer, user, published_category, published_location):
+    now = timezone.now()
+    return mixer.cycle(N_PER_PAGE + 5).blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        location=published_location,
+        is_published=True,
+        image='',
+        pub_date=(now - timedelta(hours=hour) for hour in range(1, 100)),
+    )
+
+
+@pytest.fixture
+def hidden_post(mixer, user, published_category):
+    return mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=False, pub_date=timezone.now() - timedelta(hours=1),
+    )
+
+
+def _get(client, url, status=200, **params):
+    response = client.get(url, params)
+    assert response.status_code == status, (
+        f'Убедитесь, что {url} отвечает {status}.'
+    )
+    assert response['Content-Type'].startswith('application/json')
+    return response, response.json()
+
+
+def test_posts_keyset_pages(client, api_posts, hidden_post):
+    _, data = _get(client, '/api/v1/posts/')
+    ids = [item['id'] for item in data['results']]
+    assert len(ids) == N_PER_PAGE
+    assert data['previous'] is None and data['next']
+    _, rest = _get(client, data['next'])
+    ids += [item['id'] for item in rest['results']]
+    assert rest['next'] is None
+    expected = [
+        post.id for post in sorted(
+            api_posts, key=lambda post: post.pub_date, reverse=True
+        )
+    ]
+    assert ids == expected, (
+        'Убедитесь, что API отдаёт ленту целиком, по убыванию даты '
+        'и без скрытых постов.'
+    )
+
+
+def test_posts_fields(client, api_posts, user, published_category,
+                      published_location):
+    _, data = _get(client, '/api/v1/posts/')
+    item = data['results'][0]
+    assert item['author'] == user.username
+    assert item['category'] == published_category.slug
+    assert item['location'] == published_location.name
+    assert item['image'] is None
+    _, data = _get(client, '/api/v1/posts/', fields='id,title')
+    assert all(set(item) == {'id', 'title'} for item in data['results']), (
+        'Убедитесь, что параметр fields оставляет только выбранные поля.'
+    )
+    _, data = _get(client, '/api/v1/posts/', status=400, fields='password')
+    assert 'error' in data
+
+
+def test_posts_skip_model_instances(
+        client, api_posts, django_assert_max_num_queries
+):
+    from blog.cache import next_publication
+    from blog.lookups import get_tables
+    from blog.models import Post
+
+    created = []
+
+    def remember(sender, instance, **kwargs):
+        created.append(instance)
+
+    # Справочники и расписание процесс держит в памяти.
+    get_tables()
+    next_publication()
+    post_init.connect(remember, sender=Post)
+    try:
+        with django_assert_max_num_queries(1):
+            _get(client, '/api/v1/posts/', fields='id,title,pub_date')
+    finally:
+        post_init.disconnect(remember, sender=Post)
+    assert not created, (
+        'Убедитесь, что API собирает ответ из values(), не создавая '
+        'объекты моделей.'
+    )
+
+
+def test_post_detail_and_comments(
+        client, api_posts, hidden_post, mixer, user
+):
+    post = api_posts[0]
+    mixer.cycle(3).blend('blog.Comments', post=post, author=user)
+    mixer.blend('blog.Comments', post=post, author=user, is_published=False)
+    _, data = _get(client, f'/api/v1/posts/{post.id}/')
+    assert data['id'] == post.id and data['title'] == post.title
+    _, data = _get(client, f'/api/v1/posts/{post.id}/comments/')
+    assert len(data['results']) == 3
+    assert data['results'][0]['author'] == user.username
+    _get(client, f'/api/v1/posts/{hidden_post.id}/', status=404)
+    _get(client, f'/api/v1/posts/{hidden_post.id}/comments/', status=404)
+
+
+def test_categories_and_profiles(client, published_category, mixer, user):
+    hidden = mixer.blend('blog.Category', is_published=False)
+    _, data = _get(client, '/api/v1/categories/')
+    slugs = [item['slug'] for item in data['results']]
+    assert published_category.slug in slugs and hidden.slug not in slugs
+    _, data = _get(client, f'/api/v1/categories/{published_category.slug}/')
+    assert data['title'] == published_category.title
+    _get(client, f'/api/v1/categories/{hidden.slug}/', status=404)
+    _, data = _get(client, f'/api/v1/profiles/{user.username}/')
+    assert data['username'] == user.username
+    assert 'password' not in data and 'email' not in data
+    _get(client, '/api/v1/profiles/nobody-here/', status=404)
+
+
+def test_api_etag(client, api_posts):
+    response, _ = _get(client, '/api/v1/posts/')
+    repeat = client.get(
+        '/api/v1/posts/', HTTP_IF_NONE_MATCH=response['ETag']
+    )
+    assert repeat.status_code == 304, (
+        'Убедитесь, что API отвечает 304 на запрос с актуальным ETag.'
+    )
+    post = api_posts[0]
+    post.title = 'Новый заголовок'
+    post.save()
+    response = client.get(
+        '/api/v1/posts/', HTTP_IF_NONE_MATCH=response['ETag']
+    )
+    assert response.status_code == 200
+    assert response.json()['results'][0]['title'] == 'Новый заголовок'
+
+
+def test_comments_match_html_page(client, api_posts, mixer, user):
+    post = api_posts[0]
+    published = mixer.cycle(2).blend(
+        'blog.Comments', post=post, author=user, text='Видимый комментарий'
+    )
+    hidden = mixer.blend(
+        'blog.Comments', post=post, author=user, is_published=False,
+        text='Скрытый комментарий'
+    )
+    post.refresh_from_db()
+    response = client.get(f'/posts/{post.id}/')
+    html_ids = [comment.id for comment in response.context['comments']]
+    _, data = _get(client, f'/api/v1/posts/{post.id}/comments/')
+    api_ids = [item['id'] for item in data['results']]
+    assert html_ids == api_ids == [comment.id for comment in published], (
+        'Убедитесь, что страница поста и API показывают одни и те же '
+        'комментарии.'
+    )
+    assert hidden.text not in response.content.decode()
+    _, data = _get(client, f'/api/v1/posts/{post.id}/', fields='comment_count')
+    assert data['comment_count'] == len(api_ids)
@@ -0,0 +1,99 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+URL = '/api/v1/posts/batch/'
+
+
+@pytest.fixture
+def batch_posts(mixer, user, published_category):
+    now = timezone.now()
+    public = mixer.cycle(3).blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=now - timedelta(hours=1),
+    )
+    hidden = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=False, pub_date=now - timedelta(hours=1),
+    )
+    future = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=now + timedelta(days=1),
+    )
+    return public, hidden, future
+
+
+def _ids(*posts):
+    return ','.join(str(post.id) for post in posts)
+
+
+def test_batch_keeps_order(client, batch_posts):
+    public, _, _ = batch_posts
+    order = [public[2], public[0], public[1]]
+    data = client.get(URL, {'ids': _ids(*order, public[0])}).json()
+    assert [item['id'] for item in data['results']] == [
+        post.id for post in order
+    ], 'Убедитесь, что посты идут в порядке запрошенных id без повторов.'
+    assert data['missing'] == []
+
+
+def test_batch_visibility_per_viewer(
+        client, user_client, another_user_client, batch_posts
+):
+    public, hidden, future = batch_posts
+    ids = _ids(public[0], hidden, future)
+    for reader in (client, another_user_client):
+        data = reader.get(URL, {'ids': ids}).json()
+        assert [item['id'] for item in data['results']] == [public[0].id]
+        assert data['missing'] == [hidden.id, future.id], (
+            'Убедитесь, что чужие скрытые и отложенные посты не отдаются.'
+        )
+    response = user_client.get(URL, {'ids': ids})
+    assert [item['id'] for item in response.json()['results']] == [
+        public[0].id, hidden.id, future.id
+    ], 'Убедитесь, что автор видит свои скрытые и отложенные посты.'
+    assert 'private' in response['Cache-Control']
+    repeat = another_user_client.get(
+        URL, {'ids': ids}, HTTP_IF_NONE_MATCH=response['ETag']
+    )
+    assert repeat.status_code == 200, (
+        'Убедитесь, что ETag автора не подходит другому читателю.'
+    )
+
+
+def test_batch_single_query(user_client, batch_posts, user):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from blog.cache import next_publication
+    from blog.lookups import get_tables, users_by_id
+
+    public, hidden, future = batch_posts
+    # Справочники и расписание процесс держит в памяти.
+    get_tables()
+    users_by_id({user.pk})
+    next_publication()
+    with CaptureQueriesContext(connection) as context:
+        response = user_client.get(
+            URL, {'ids': _ids(*public, hidden, future)}
+        )
+    assert len(response.json()['results']) == 5
+    post_queries = [
+        query for query in context.captured_queries
+        if 'FROM "blog_post"' in query['sql']
+    ]
+    assert len(post_queries) == 1, (
+        'Убедитесь, что посты по списку id достаются одним запросом.'
+    )
+
+
+def test_batch_bad_ids(client, batch_posts):
+    for ids in ('', '1,x', ','.join(map(str, range(1, 502)))):
+        response = client.get(URL, {'ids': ids})
+        assert response.status_code == 400, (
+            f'Убедитесь, что ids={ids[:20]} даёт ответ 400.'
+        )
+        assert 'error' in response.json()
@@ -0,0 +1,65 @@
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _count(post):
+    post.refresh_from_db(fields=['comment_count'])
+    return post.comment_count
+
+
+def test_comment_count_follows_views(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    for text in ('первый', 'второй'):
+        user_client.post(f'/posts/{post.id}/comment/', {'text': text})
+    assert _count(post) == 2, (
+        'Убедитесь, что добавление комментария увеличивает счётчик '
+        'комментариев публикации.'
+    )
+
+    comment = post.comments.first()
+    user_client.post(f'/posts/{post.id}/delete_comment/{comment.id}/')
+    assert _count(post) == 1, (
+        'Убедитесь, что удаление комментария уменьшает счётчик '
+        'комментариев публикации.'
+    )
+
+
+def test_comment_count_follows_publish_toggle(
+        mixer, post_with_published_location
+):
+    post = post_with_published_location
+    comment = mixer.blend('blog.Comments', post=post)
+    assert _count(post) == 1
+
+    comment.is_published = False
+    comment.save()
+    assert _count(post) == 0, (
+        'Убедитесь, что снятый с публикации комментарий не учитывается '
+        'в счётчике.'
+    )
+    comment.save()
+    assert _count(post) == 0
+
+    comment.is_published = True
+    comment.save()
+    assert _count(post) == 1
+
+    post.title = 'Новый заголовок'
+    post.save()
+    assert _count(post) == 1, (
+        'Убедитесь, что сохранение публикации не затирает счётчик.'
+    )
+
+
+def test_recount_comments_command(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(3).blend('blog.Comments', post=post)
+    mixer.blend('blog.Comments', post=post, is_published=False)
+    type(post).objects.update(comment_count=0)
+
+    call_command('recount_comments', batch_size=1, stdout=None)
+    assert _count(post) == 3
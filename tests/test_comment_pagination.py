@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+N_COMMENTS = 45
+
+
+@pytest.fixture
+def commented_post(mixer, post_with_published_location, user):
+    post = post_with_published_location
+    now = timezone.now()
+    # Одинаковое время у пар комментариев проверяет досортировку по id.
+    created = (now - timedelta(minutes=i // 2) for i in range(N_COMMENTS))
+    mixer.cycle(N_COMMENTS).blend(
+        'blog.Comments', post=post, author=user, created_at=created
+    )
+    return post
+
+
+def test_detail_shows_first_comments(client, commented_post):
+    from blog.views import COMMENTS_NUM
+
+    response = client.get(f'/posts/{commented_post.id}/')
+    comments = response.context['comments']
+    assert len(comments) == COMMENTS_NUM, (
+        'Убедитесь, что на странице поста выводится только первая '
+        'порция комментариев.'
+    )
+    assert comments.has_next()
+    assert 'data-load-more' in response.content.decode()
+
+
+def test_load_more_walks_all_comments(client, commented_post):
+    expected = list(
+        commented_post.comments.order_by('created_at', 'id')
+        .values_list('id', flat=True)
+    )
+    response = client.get(f'/posts/{commented_post.id}/')
+    seen = [comment.id for comment in response.context['comments']]
+    cursor = response.context['comments'].next_cursor
+    while cursor:
+        response = client.get(
+            f'/posts/{commented_post.id}/comments/', {'cursor': cursor}
+        )
+        assert response.status_code == 200
+        content = response.content.decode()
+        assert '<html' not in content, (
+            'Убедитесь, что «Показать ещё» возвращает только фрагмент '
+            'со следующими комментариями.'
+        )
+        page = response.context['comments']
+        seen += [comment.id for comment in page]
+        cursor = page.next_cursor
+    assert seen == expected, (
+        'Убедитесь, что подгрузка комментариев проходит их все по порядку '
+        'created_at без пропусков и повторов.'
+    )
+
+
+def test_comments_fragment_hidden_for_unpublished_post(
+        client, commented_post
+):
+    type(commented_post).objects.filter(pk=commented_post.pk).update(
+        is_published=False
+    )
+    response = client.get(f'/posts/{commented_post.id}/comments/')
+    assert response.status_code == 404
+
+
+def test_bad_comment_cursor_is_404(client, commented_post):
+    response = client.get(
+        f'/posts/{commented_post.id}/comments/', {'cursor': 'garbage'}
+    )
+    assert response.status_code == 404
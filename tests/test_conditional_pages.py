@@ -0,0 +1,160 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _urls(post, user):
+    return (
+        '/',
+        f'/category/{post.category.slug}/',
+        f'/profile/{user.username}/',
+        f'/posts/{post.id}/',
+    )
+
+
+@pytest.fixture
+def fresh_counts(monkeypatch):
+    """Счётчики ответов процесса без следов других тестов."""
+    import time
+    from collections import Counter
+
+    monkeypatch.setattr(
+        'blog.cache._responses',
+        {'counts': Counter(), 'flushed_at': time.monotonic()}
+    )
+
+
+@pytest.fixture
+def warm():
+    from blog.cache import next_publication
+    from blog.lookups import get_tables
+
+    get_tables()
+    next_publication()
+
+
+def test_repeat_request_not_modified(
+        client, post_with_published_location, user, warm,
+        django_assert_num_queries
+):
+    for url in _urls(post_with_published_location, user):
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.has_header('ETag') and response.has_header(
+            'Last-Modified'
+        ), f'Убедитесь, что страница {url} отдаёт ETag и Last-Modified.'
+        with django_assert_num_queries(0):
+            repeat = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert repeat.status_code == 304, (
+            f'Убедитесь, что повторный запрос {url} получает 304.'
+        )
+        assert not repeat.content
+        repeat = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        assert repeat.status_code == 304
+
+
+def test_etag_changes_with_content(client, post_with_published_location):
+    post = post_with_published_location
+    url = f'/posts/{post.id}/'
+    etag = client.get(url)['ETag']
+    post.comments.create(text='Новый комментарий', author=post.author)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        'Убедитесь, что после нового комментария страница отдаётся заново.'
+    )
+    assert 'Новый комментарий' in response.content.decode()
+
+
+def test_etag_depends_on_viewer(
+        client, user_client, another_user_client,
+        post_with_published_location, user
+):
+    url = '/'
+    anonymous = client.get(url)
+    assert anonymous['Cache-Control'] == 'no-cache'
+    own = user_client.get(url)
+    assert own['ETag'] != anonymous['ETag']
+    assert 'private' in own['Cache-Control']
+    assert not own.has_header('Last-Modified'), (
+        'Убедитесь, что личные страницы не отдают Last-Modified.'
+    )
+    assert user_client.get(
+        url, HTTP_IF_NONE_MATCH=own['ETag']
+    ).status_code == 304
+    response = another_user_client.get(url, HTTP_IF_NONE_MATCH=own['ETag'])
+    assert response.status_code == 200, (
+        'Убедитесь, что ETag одного читателя не подходит другому.'
+    )
+
+
+def test_response_stats(
+        client, post_with_published_location, user, fresh_counts
+):
+    url = f'/posts/{post_with_published_location.id}/'
+    call_command('response_stats', reset=True, stdout=StringIO())
+    etag = client.get(url)['ETag']
+    client.get(url, HTTP_IF_NONE_MATCH=etag)
+    client.get(url, HTTP_IF_NONE_MATCH=etag)
+    out = StringIO()
+    call_command('response_stats', stdout=out)
+    line = next(
+        line for line in out.getvalue().splitlines()
+        if line.startswith('PostDetailView')
+    )
+    assert '200:        1' in line and '304:        2' in line, (
+        'Убедитесь, что команда response_stats считает ответы 200 и 304.'
+    )
+    assert '66.7%' in line
+
+
+def test_response_stats_from_another_process(
+        client, post_with_published_location, settings, fresh_counts,
+        monkeypatch
+):
+    import os
+    import subprocess
+    import sys
+
+    monkeypatch.setattr('blog.cache.RESPONSE_COUNTS_FLUSH_INTERVAL', 0)
+
+    url = f'/posts/{post_with_published_location.id}/'
+    etag = client.get(url)['ETag']
+    client.get(url, HTTP_IF_NONE_MATCH=etag)
+    output = subprocess.run(
+        [sys.executable, 'manage.py', 'response_stats'],
+        cwd=settings.BASE_DIR,
+        env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'blogicum.settings'},
+        capture_output=True, text=True, check=True,
+    ).stdout
+    line = next(
+        line for line in output.splitlines()
+        if line.startswith('PostDetailView')
+    )
+    assert '200:        1' in line and '304:        1' in line, (
+        'Убедитесь, что manage.py response_stats в отдельном процессе '
+        'видит ответы, отданные сервером.'
+    )
+
+
+def test_not_modified_skips_cache_writes(
+        client, post_with_published_location, fresh_counts, monkeypatch
+):
+    from django.core.cache.backends.filebased import FileBasedCache
+
+    url = f'/posts/{post_with_published_location.id}/'
+    etag = client.get(url)['ETag']
+    writes = []
+    monkeypatch.setattr(
+        FileBasedCache, 'set', lambda *args, **kwargs: writes.append(args)
+    )
+    for _ in range(3):
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    assert not writes, (
+        'Убедитесь, что ответ 304 копит счётчики в памяти процесса и не '
+        'пишет в общий кэш на каждый запрос.'
+    )
@@ -0,0 +1,104 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_post(mixer, user, published_category):
+    return mixer.blend(
+        'blog.Post',
+        title='Пост для ленты',
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+
+
+@pytest.fixture
+def hidden_post(mixer, user, published_category):
+    return mixer.blend(
+        'blog.Post',
+        title='Скрытый пост',
+        author=user,
+        category=published_category,
+        is_published=False,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+
+
+def _feed_urls(category, user):
+    for fmt in ('rss', 'atom'):
+        yield f'/feed/{fmt}/'
+        yield f'/category/{category.slug}/feed/{fmt}/'
+        yield f'/profile/{user.username}/feed/{fmt}/'
+
+
+def test_feeds_list_visible_posts(
+        client, feed_post, hidden_post, published_category, user
+):
+    for url in _feed_urls(published_category, user):
+        response = client.get(url)
+        assert response.status_code == 200, (
+            f'Убедитесь, что лента {url} доступна.'
+        )
+        content = response.content.decode()
+        assert feed_post.title in content, (
+            f'Убедитесь, что в ленте {url} есть опубликованные посты.'
+        )
+        assert hidden_post.title not in content, (
+            f'Убедитесь, что в ленту {url} не попадают скрытые посты.'
+        )
+        assert response.has_header('ETag')
+        assert not response['ETag'].startswith('W/'), (
+            'Убедитесь, что лента отдаёт сильный ETag.'
+        )
+        assert response.has_header('Last-Modified')
+
+
+def test_feed_unknown_owner_404(client, mixer):
+    hidden = mixer.blend('blog.Category', is_published=False)
+    for url in (
+        f'/category/{hidden.slug}/feed/rss/',
+        '/profile/nobody-here/feed/atom/',
+    ):
+        assert client.get(url).status_code == 404
+
+
+def test_feed_not_modified_without_queries(
+        client, feed_post, published_category, user,
+        django_assert_num_queries
+):
+    for url in _feed_urls(published_category, user):
+        response = client.get(url)
+        with django_assert_num_queries(0):
+            not_modified = client.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag']
+            )
+        assert not_modified.status_code == 304, (
+            f'Убедитесь, что неизменённая лента {url} отдаёт 304.'
+        )
+        not_modified = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        assert not_modified.status_code == 304
+
+
+def test_feed_etag_changes_with_posts(
+        client, feed_post, published_category, user, mixer
+):
+    url = '/feed/atom/'
+    etag = client.get(url)['ETag']
+    feed_post.title = 'Новый заголовок'
+    feed_post.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        'Убедитесь, что после изменения поста лента отдаётся заново.'
+    )
+    assert 'Новый заголовок' in response.content.decode()
+    etag = response['ETag']
+    feed_post.delete()
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
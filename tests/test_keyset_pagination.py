@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_posts(mixer, user, published_category):
+    now = timezone.now()
+    # Пары постов с одинаковой датой проверяют досортировку по id.
+    pub_dates = (
+        now - timedelta(hours=hour // 2) for hour in range(2, 100)
+    )
+    return mixer.cycle(N_PER_PAGE * 2 + 5).blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=pub_dates,
+    )
+
+
+def _walk(client, url):
+    seen = []
+    cursor = ''
+    while True:
+        response = client.get(url, {'cursor': cursor})
+        assert response.status_code == 200, (
+            'Убедитесь, что страница с курсором загружается без ошибок.'
+        )
+        page_obj = response.context['page_obj']
+        assert page_obj.is_keyset
+        seen.append([post.id for post in page_obj])
+        if not page_obj.has_next():
+            return seen, response
+        cursor = page_obj.next_cursor
+
+
+@pytest.mark.parametrize('url_name', ('index', 'category', 'profile'))
+def test_keyset_walks_whole_feed(
+        client, feed_posts, published_category, user, url_name
+):
+    url = {
+        'index': '/',
+        'category': f'/category/{published_category.slug}/',
+        'profile': f'/profile/{user.username}/',
+    }[url_name]
+    pages, last_response = _walk(client, url)
+    expected = [
+        post.id for post in sorted(
+            feed_posts, key=lambda post: (post.pub_date, post.id),
+            reverse=True
+        )
+    ]
+    assert [post_id for page in pages for post_id in page] == expected, (
+        'Убедитесь, что при пагинации по курсору посты идут «от новых к '
+        'старым» без пропусков и повторов.'
+    )
+    assert [len(page) for page in pages] == [N_PER_PAGE, N_PER_PAGE, 5]
+
+    page_obj = last_response.context['page_obj']
+    response = client.get(url, {'cursor': page_obj.previous_cursor})
+    assert [post.id for post in response.context['page_obj']] == pages[1], (
+        'Убедитесь, что курсор предыдущей страницы возвращает её целиком.'
+    )
+
+
+def test_keyset_deep_page_skips_offset_and_count(client, feed_posts):
+    _, last_response = _walk(client, '/')
+    cursor = last_response.context['page_obj'].previous_cursor
+    with CaptureQueriesContext(connection) as ctx:
+        client.get('/', {'cursor': cursor})
+    sql = ' '.join(query['sql'] for query in ctx.captured_queries).upper()
+    assert 'COUNT(*)' not in sql
+    assert 'OFFSET' not in sql
+
+
+def test_keyset_invalid_cursor(client, feed_posts):
+    response = client.get('/', {'cursor': 'not-a-cursor'})
+    assert response.status_code == 404
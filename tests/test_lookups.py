@@ -0,0 +1,119 @@
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def disable_page_cache():
+    with override_settings(PAGE_CACHE_TIMEOUT=0):
+        yield
+
+
+def test_feed_does_not_join_lookups(client, post_with_published_location):
+    post = post_with_published_location
+    client.get('/')
+    for url in ('/', f'/category/{post.category.slug}/'):
+        with CaptureQueriesContext(connection) as ctx:
+            content = client.get(url).content.decode()
+        for query in ctx.captured_queries:
+            assert 'blog_category' not in query['sql'], (
+                f'Убедитесь, что лента {url} берёт категории из кэша, '
+                'а не из базы.'
+            )
+            assert 'blog_location' not in query['sql']
+        assert post.category.title in content
+        assert post.location.name in content
+
+
+def test_admin_save_invalidates_lookups(
+        client, post_with_published_location
+):
+    post = post_with_published_location
+    category_url = f'/category/{post.category.slug}/'
+    assert client.get(category_url).status_code == 200
+    post.location.name = 'Новое место'
+    post.location.save()
+    assert 'Новое место' in client.get('/').content.decode(), (
+        'Убедитесь, что изменение местоположения обновляет кэш.'
+    )
+    post.category.is_published = False
+    post.category.save()
+    assert client.get(category_url).status_code == 404, (
+        'Убедитесь, что снятая с публикации категория пропадает из кэша.'
+    )
+    assert post.title not in client.get('/').content.decode()
+
+
+def _user_queries(ctx):
+    return [
+        query['sql'] for query in ctx.captured_queries
+        if 'FROM "users_myuser"' in query['sql']
+    ]
+
+
+def test_profile_runs_one_user_query(client, post_with_published_location):
+    url = f'/profile/{post_with_published_location.author.username}/'
+    with CaptureQueriesContext(connection) as ctx:
+        assert client.get(url).status_code == 200
+    assert len(_user_queries(ctx)) <= 1, (
+        'Убедитесь, что страница профиля запрашивает пользователя '
+        'не больше одного раза.'
+    )
+    with CaptureQueriesContext(connection) as ctx:
+        client.get(url)
+        client.get('/')
+    assert not _user_queries(ctx), (
+        'Убедитесь, что профиль и авторы постов берутся из кэша.'
+    )
+
+
+def test_profile_edit_invalidates_users(
+        user, user_client, post_with_published_location
+):
+    user_client.get('/')
+    response = user_client.post('/edit', {
+        'username': 'renamed_author',
+        'first_name': 'Новое',
+        'last_name': 'Имя',
+        'email': 'renamed@example.com',
+    })
+    assert response.status_code == 302
+    content = user_client.get('/').content.decode()
+    assert '@renamed_author' in content, (
+        'Убедитесь, что сохранение профиля обновляет кэш пользователей.'
+    )
+    assert user_client.get('/profile/renamed_author/').status_code == 200
+
+
+def test_lookups_reloaded_after_max_age(
+        client, post_with_published_location, monkeypatch
+):
+    post = post_with_published_location
+    category_url = f'/category/{post.category.slug}/'
+    assert client.get(category_url).status_code == 200
+    # Изменение в обход сигналов версию не поднимает.
+    type(post.category).objects.filter(pk=post.category.pk).update(
+        is_published=False
+    )
+    assert client.get(category_url).status_code == 200
+    monkeypatch.setattr('blog.lookups.TABLES_MAX_AGE', 0)
+    assert client.get(category_url).status_code == 404, (
+        'Убедитесь, что справочники в памяти процесса перечитываются '
+        'по истечении TABLES_MAX_AGE.'
+    )
+
+
+def test_users_reloaded_after_max_age(
+        client, user, post_with_published_location, monkeypatch
+):
+    client.get('/')
+    type(user).objects.filter(pk=user.pk).update(username='quiet_rename')
+    assert '@quiet_rename' not in client.get('/').content.decode()
+    monkeypatch.setattr('blog.lookups.TABLES_MAX_AGE', 0)
+    assert '@quiet_rename' in client.get('/').content.decode(), (
+        'Убедитесь, что пользователи в памяти процесса перечитываются '
+        'по истечении TABLES_MAX_AGE.'
+    )
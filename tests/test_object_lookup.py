@@ -0,0 +1,84 @@
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+# Сессия и пользователь запроса: по одному запросу на любую страницу.
+AUTH_QUERIES = 2
+
+
+@pytest.fixture(autouse=True)
+def disable_page_cache():
+    # Считаем запросы страницы, собранной заново, а не взятой из кэша.
+    with override_settings(PAGE_CACHE_TIMEOUT=0):
+        yield
+
+
+def _assert_object_fetched_once(client, url, table, expected_queries):
+    from django.contrib.auth import get_user_model
+
+    from blog.cache import next_publication
+    from blog.lookups import get_tables, users_by_id
+
+    # Категории, местоположения, авторов и ближайшую отложенную
+    # публикацию процесс держит в памяти.
+    get_tables()
+    next_publication()
+    users_by_id(get_user_model().objects.values_list('pk', flat=True))
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    object_queries = [
+        query['sql'] for query in ctx.captured_queries
+        if f'FROM "{table}"' in query['sql']
+        and f'"{table}"."id" =' in query['sql']
+    ]
+    assert len(object_queries) == 1, (
+        f'Убедитесь, что на странице {url} объект запрашивается из базы '
+        'один раз за запрос.'
+    )
+    assert len(ctx.captured_queries) == expected_queries, (
+        f'Убедитесь, что страница {url} выполняет {expected_queries} '
+        f'запросов к базе, а не {len(ctx.captured_queries)}.'
+    )
+
+
+@pytest.mark.parametrize(
+    'url, expected_queries',
+    (
+        # пост, комментарии
+        ('/posts/{post}/', AUTH_QUERIES + 2),
+        # пост, варианты местоположений и категорий для формы
+        ('/posts/{post}/edit/', AUTH_QUERIES + 3),
+        # пост вместе с местоположением
+        ('/posts/{post}/delete/', AUTH_QUERIES + 1),
+    )
+)
+def test_post_fetched_once(
+        user_client, post_with_published_location, url, expected_queries
+):
+    url = url.format(post=post_with_published_location.id)
+    _assert_object_fetched_once(
+        user_client, url, 'blog_post', expected_queries
+    )
+
+
+@pytest.mark.parametrize(
+    'url',
+    (
+        '/posts/{post}/edit_comment/{comment}/',
+        '/posts/{post}/delete_comment/{comment}/',
+    )
+)
+def test_comment_fetched_once(
+        mixer, user, user_client, post_with_published_location, url
+):
+    comment = mixer.blend(
+        'blog.Comments', post=post_with_published_location, author=user
+    )
+    url = url.format(post=comment.post_id, comment=comment.id)
+    _assert_object_fetched_once(
+        user_client, url, 'blog_comments', AUTH_QUERIES + 1
+    )
@@ -0,0 +1,269 @@
+import os
+from contextlib import contextmanager
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def urls(post_with_published_location):
+    post = post_with_published_location
+    return (
+        '/',
+        f'/category/{post.category.slug}/',
+        f'/posts/{post.id}/',
+    )
+
+
+def test_anonymous_pages_cached(
+        client, urls, django_assert_num_queries
+):
+    for url in urls:
+        first = client.get(url)
+        with django_assert_num_queries(0):
+            second = client.get(url)
+        assert second.content == first.content, (
+            f'Убедитесь, что страница {url} для анонимного читателя '
+            'отдаётся из кэша.'
+        )
+
+
+def test_authenticated_pages_cached(user_client, urls):
+    for url in urls:
+        user_client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            user_client.get(url)
+        # Остаются только сессия и пользователь запроса.
+        assert len(ctx.captured_queries) == 2, (
+            f'Убедитесь, что страница {url} для авторизованных читателей '
+            'тоже отдаётся из кэша.'
+        )
+
+
+def test_overlay_keeps_pages_personal(
+        user_client, another_user_client, post_with_published_location
+):
+    from blog.cache import CSRF_PLACEHOLDER
+
+    post = post_with_published_location
+    url = f'/posts/{post.id}/'
+    edit_url = f'/posts/{post.id}/edit/'
+    other = another_user_client.get(url).content.decode()
+    own = user_client.get(url).content.decode()
+    assert edit_url in own and edit_url not in other, (
+        'Убедитесь, что кнопки автора из общей страницы видит '
+        'только автор.'
+    )
+    for client, content in ((user_client, own), (another_user_client, other)):
+        username = client.get('/').context['user'].username
+        assert f'/profile/{username}/' in content, (
+            'Убедитесь, что в шапке закэшированной страницы меню '
+            'текущего пользователя.'
+        )
+        for marker in ('<!--viewer-->', '<!--author:', CSRF_PLACEHOLDER):
+            assert marker not in content
+
+
+def test_overlay_csrf_token_accepted(
+        user, another_user_client, post_with_published_location
+):
+    from django.test import Client
+
+    url = f'/posts/{post_with_published_location.id}/'
+    another_user_client.get(url)
+    client = Client(enforce_csrf_checks=True)
+    client.force_login(user)
+    content = client.get(url).content.decode()
+    token = content.split('name="csrfmiddlewaretoken" value="')[1]
+    token = token.split('"')[0]
+    response = client.post(
+        f'{url}comment/',
+        {'text': 'Через общий кэш', 'csrfmiddlewaretoken': token}
+    )
+    assert response.status_code == 302, (
+        'Убедитесь, что CSRF-токен в закэшированной странице '
+        'подставляется для текущего пользователя.'
+    )
+    assert post_with_published_location.comments.filter(
+        text='Через общий кэш'
+    ).exists()
+
+
+def test_overlay_keeps_user_text(
+        user_client, another_user_client, post_with_published_location
+):
+    from blog.cache import CSRF_PLACEHOLDER
+
+    post = post_with_published_location
+    post.text = f'Текст с {CSRF_PLACEHOLDER} внутри'
+    post.save()
+    url = f'/posts/{post.id}/'
+    another_user_client.get(url)
+    content = user_client.get(url).content.decode()
+    token = content.split('name="csrfmiddlewaretoken" value="')[1]
+    token = token.split('"')[0]
+    assert token != CSRF_PLACEHOLDER
+    assert post.text in content and token not in post.text, (
+        'Убедитесь, что CSRF-токен подставляется только в скрытое поле '
+        'формы, а не в текст публикации.'
+    )
+
+
+def test_hidden_post_not_shared(
+        user_client, another_user_client, post_with_published_location
+):
+    post = post_with_published_location
+    type(post).objects.filter(pk=post.pk).update(is_published=False)
+    assert user_client.get(f'/posts/{post.id}/').status_code == 200
+    assert another_user_client.get(f'/posts/{post.id}/').status_code == 404, (
+        'Убедитесь, что страница скрытого поста, открытая автором, '
+        'не попадает в общий кэш.'
+    )
+
+
+@pytest.mark.parametrize(
+    'relation, field',
+    (('', 'title'), ('category', 'title'), ('location', 'name'))
+)
+def test_cache_invalidated_on_save(
+        client, urls, post_with_published_location, relation, field
+):
+    post = post_with_published_location
+    client.get('/')
+    obj = getattr(post, relation) if relation else post
+    setattr(obj, field, 'Новое значение')
+    obj.save()
+    assert 'Новое значение' in client.get('/').content.decode(), (
+        'Убедитесь, что изменение публикации, категории или '
+        'местоположения сбрасывает кэш страниц.'
+    )
+
+
+def test_cache_invalidated_on_comment(client, mixer, urls, user):
+    post_url = urls[2]
+    client.get(post_url)
+    post_id = int(post_url.strip('/').split('/')[-1])
+    mixer.blend(
+        'blog.Comments', post_id=post_id, author=user, text='Новый отзыв'
+    )
+    assert 'Новый отзыв' in client.get(post_url).content.decode()
+
+
+def test_cache_expires_at_scheduled_publication(
+        mixer, user, published_category
+):
+    from blog.cache import page_cache_timeout
+
+    mixer.blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() + timedelta(seconds=30)
+    )
+    # Граница видимости округляется до минуты: пост выйдет в течение 90 с.
+    assert 0 < page_cache_timeout() <= 90, (
+        'Убедитесь, что кэш страниц истекает к моменту выхода '
+        'отложенной публикации.'
+    )
+
+
+
+@pytest.fixture
+def other_process(monkeypatch):
+    """Переключает блог на отдельный экземпляр бэкенда кэша."""
+    from django.core.cache import caches
+
+    other = caches.create_connection('default')
+
+    @contextmanager
+    def switch():
+        with monkeypatch.context() as patch:
+            for module in ('blog.cache', 'blog.lookups'):
+                patch.setattr(f'{module}.cache', other)
+            yield
+
+    return switch
+
+
+def test_invalidation_seen_by_another_process(
+        client, post_with_published_location, other_process
+):
+    post = post_with_published_location
+    url = f'/posts/{post.id}/'
+    with other_process():
+        client.get(url)
+    # Пост меняется в этом процессе, страницу отдаёт другой.
+    post.title = 'Заголовок из этого процесса'
+    post.save()
+    with other_process():
+        content = client.get(url).content.decode()
+    assert post.title in content, (
+        'Убедитесь, что изменение в одном процессе сервера сбрасывает '
+        'кэш страниц других процессов: кэш должен быть общим.'
+    )
+
+
+def test_generation_shared_with_another_process(settings):
+    import subprocess
+    import sys
+
+    from blog.cache import bump_generation, get_generation
+
+    get_generation()
+    bump_generation()
+    output = subprocess.run(
+        [
+            sys.executable, '-c',
+            'import django; django.setup(); '
+            'from blog.cache import get_generation; print(get_generation())'
+        ],
+        cwd=settings.BASE_DIR,
+        env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'blogicum.settings'},
+        capture_output=True, text=True, check=True,
+    ).stdout
+    assert int(output) == get_generation(), (
+        'Убедитесь, что поколение кэша, поднятое в одном процессе, '
+        'видно в другом.'
+    )
+
+
+def test_per_process_cache_refused(settings):
+    from blog.cache import check_shared_cache
+
+    assert check_shared_cache() == []
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+    assert [error.id for error in check_shared_cache()] == ['blog.E001'], (
+        'Убедитесь, что проверка проекта сообщает об ошибке, если кэш '
+        'живёт в памяти одного процесса.'
+    )
+
+
+def test_unknown_params_share_page(client, urls, django_assert_num_queries):
+    from blog.cache import page_cache_key
+
+    client.get('/')
+    with django_assert_num_queries(0):
+        for number in range(3):
+            client.get('/', {'x': number})
+
+    def key(params):
+        return page_cache_key(
+            RequestFactory().get('/', params), 'anonymous', 1
+        )
+
+    assert key({'x': 1}) == key({}) != key({'page': 2}), (
+        'Убедитесь, что ключ страницы зависит только от пути и '
+        'параметров постраничного вывода.'
+    )
+    assert key({'cursor': ''}) != key({})
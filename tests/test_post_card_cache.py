@@ -0,0 +1,27 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_post_card_cached_per_version(
+        user_client, mixer, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.get('/')
+
+    # update() не меняет updated_at, поэтому карточка берётся из кэша.
+    type(post).objects.filter(pk=post.pk).update(title='Тихая правка')
+    assert 'Тихая правка' not in user_client.get('/').content.decode(), (
+        'Убедитесь, что карточка поста кэшируется.'
+    )
+
+    post.refresh_from_db()
+    post.save()
+    assert 'Тихая правка' in user_client.get('/').content.decode(), (
+        'Убедитесь, что изменение поста обновляет его карточку.'
+    )
+
+    mixer.blend('blog.Comments', post=post)
+    assert 'Комментарии (1)' in user_client.get('/').content.decode(), (
+        'Убедитесь, что новый комментарий обновляет карточку поста.'
+    )
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import pytest
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+START = datetime(2030, 1, 1, 12, 0, tzinfo=dt_timezone.utc)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    class Clock:
+        now = START
+
+        def advance(self, **kwargs):
+            self.now += timedelta(**kwargs)
+
+        def time(self):
+            return self.now.timestamp()
+
+    clock = Clock()
+    monkeypatch.setattr(timezone, 'now', lambda: clock.now)
+    # Сроки жизни записей кэша отсчитываются по time.time().
+    monkeypatch.setattr('django.core.cache.backends.base.time', clock)
+    monkeypatch.setattr('django.core.cache.backends.filebased.time', clock)
+    return clock
+
+
+@pytest.fixture
+def scheduled_post(mixer, user, published_category):
+    return mixer.blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=START + timedelta(minutes=1, seconds=30),
+    )
+
+
+def _visible(client, post):
+    urls = ('/', f'/category/{post.category.slug}/', f'/posts/{post.id}/')
+    return [
+        post.title in client.get(url).content.decode() for url in urls
+    ]
+
+
+def test_scheduled_post_appears_without_restart(
+        clock, another_user_client, scheduled_post
+):
+    assert _visible(another_user_client, scheduled_post) == [False] * 3
+
+    clock.advance(minutes=1, seconds=40)
+    # Граница округлена до 12:01, публикация назначена на 12:01:30.
+    assert _visible(another_user_client, scheduled_post) == [False] * 3
+
+    clock.advance(seconds=30)
+    assert _visible(another_user_client, scheduled_post) == [True] * 3, (
+        'Убедитесь, что отложенная публикация появляется в ленте, '
+        'в категории и на своей странице, как только наступает её время, '
+        'без перезапуска сервера.'
+    )
+
+
+def test_anonymous_cache_expires_at_go_live(
+        clock, client, scheduled_post
+):
+    assert scheduled_post.title not in client.get('/').content.decode()
+    clock.advance(minutes=2)
+    assert scheduled_post.title in client.get('/').content.decode(), (
+        'Убедитесь, что кэш страниц для анонимных читателей не держит '
+        'ленту дольше момента выхода отложенной публикации.'
+    )
+
+
+def test_boundary_is_aware_and_rounded(clock):
+    from blog.utils import goes_live_at, publication_boundary
+
+    clock.advance(seconds=59, microseconds=1)
+    boundary = publication_boundary()
+    assert timezone.is_aware(boundary)
+    assert boundary == START
+    assert goes_live_at(START) == START
+    assert goes_live_at(START + timedelta(seconds=1)) == (
+        START + timedelta(minutes=1)
+    )
@@ -0,0 +1,195 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+SMALL, LARGE = 10, 1000
+
+# Маршрут: (метод, адрес, клиент, предельное число запросов).
+# Сессия и пользователь авторизованного клиента — два запроса из бюджета.
+ROUTES = {
+    'blog:index': ('get', '/', 'unlogged', 2),
+    'blog:category_posts': (
+        'get', '/category/{category}/', 'unlogged', 2
+    ),
+    'blog:profile': ('get', '/profile/{username}/', 'unlogged', 2),
+    'blog:profile (автор)': ('get', '/profile/{username}/', 'user', 4),
+    'blog:post_detail': ('get', '/posts/{post}/', 'unlogged', 2),
+    'blog:post_detail (автор)': ('get', '/posts/{post}/', 'user', 4),
+    'blog:create_post': ('get', '/posts/create/', 'user', 4),
+    'blog:edit_post': ('get', '/posts/{post}/edit/', 'user', 5),
+    'blog:delete_post': ('get', '/posts/{post}/delete/', 'user', 3),
+    'blog:add_comment': ('post', '/posts/{post}/comment/', 'user', 7),
+    'blog:edit_comment': (
+        'get', '/posts/{post}/edit_comment/{comment}/', 'user', 3
+    ),
+    'blog:delete_comment': (
+        'get', '/posts/{post}/delete_comment/{comment}/', 'user', 3
+    ),
+    'blog:edit_profile': ('get', '/edit', 'user', 2),
+    'blog:post_comments': ('get', '/posts/{post}/comments/', 'unlogged', 2),
+    'blog:search': ('get', '/search/?q=Пост', 'unlogged', 1),
+    'blog:feed_rss': ('get', '/feed/rss/', 'unlogged', 2),
+    'blog:feed_atom': ('get', '/feed/atom/', 'unlogged', 2),
+    'blog:category_feed_rss': (
+        'get', '/category/{category}/feed/rss/', 'unlogged', 2
+    ),
+    'blog:category_feed_atom': (
+        'get', '/category/{category}/feed/atom/', 'unlogged', 2
+    ),
+    'blog:profile_feed_rss': (
+        'get', '/profile/{username}/feed/rss/', 'unlogged', 2
+    ),
+    'blog:profile_feed_atom': (
+        'get', '/profile/{username}/feed/atom/', 'unlogged', 2
+    ),
+    'blog:api_posts': ('get', '/api/v1/posts/', 'unlogged', 1),
+    'blog:api_posts_batch': (
+        'get', '/api/v1/posts/batch/?ids={post}', 'unlogged', 1
+    ),
+    'blog:api_post': ('get', '/api/v1/posts/{post}/', 'unlogged', 1),
+    'blog:api_comments': (
+        'get', '/api/v1/posts/{post}/comments/', 'unlogged', 2
+    ),
+    'blog:api_categories': ('get', '/api/v1/categories/', 'unlogged', 0),
+    'blog:api_category': (
+        'get', '/api/v1/categories/{category}/', 'unlogged', 0
+    ),
+    'blog:api_profile': (
+        'get', '/api/v1/profiles/{username}/', 'unlogged', 0
+    ),
+    'pages:about': ('get', '/pages/about/', 'unlogged', 0),
+    'pages:rules': ('get', '/pages/rules/', 'unlogged', 0),
+}
+
+
+def _route_names(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _route_names(pattern.url_patterns)
+        elif pattern.name:
+            yield pattern.name
+
+
+def test_every_route_has_budget():
+    from importlib import import_module
+
+    names = {
+        f'{app}:{name}'
+        for app in ('blog', 'pages')
+        for name in _route_names(import_module(f'{app}.urls').urlpatterns)
+    }
+    missing = names - {route.split(' ')[0] for route in ROUTES}
+    assert not missing, (
+        'Убедитесь, что у каждого маршрута blog и pages есть бюджет '
+        f'запросов в ROUTES; его нет у {", ".join(sorted(missing))}.'
+    )
+
+
+@pytest.fixture(autouse=True)
+def disable_page_cache():
+    # Бюджет считается для страницы, собранной заново, а не взятой из кэша.
+    with override_settings(PAGE_CACHE_TIMEOUT=0):
+        yield
+
+
+class Dataset:
+    """Наполняет базу через bulk_create, чтобы расти до LARGE быстро."""
+
+    def __init__(self, mixer, user, category, location):
+        self.user = user
+        self.category = category
+        self.location = location
+        self.authors = mixer.cycle(5).blend(get_user_model())
+        self.post = mixer.blend(
+            'blog.Post', author=user, category=category, location=location,
+            is_published=True, pub_date=timezone.now() - timedelta(days=1)
+        )
+        self.comment = mixer.blend(
+            'blog.Comments', post=self.post, author=user
+        )
+        self.size = 0
+
+    def grow(self, size):
+        from blog.cache import bump_generation, next_publication
+        from blog.lookups import get_tables, users_by_id
+        from blog.models import Comments, Post
+
+        now = timezone.now()
+        new = range(self.size, size)
+        Post.objects.bulk_create(
+            Post(
+                title=f'Пост {i}',
+                text='Текст',
+                pub_date=now - timedelta(hours=i + 1),
+                author=self.user if i % 2 else self.authors[i % 5],
+                category=self.category,
+                location=self.location,
+            )
+            for i in new
+        )
+        Comments.objects.bulk_create(
+            Comments(
+                text=f'Комментарий {i}',
+                post=self.post,
+                author=self.authors[i % 5],
+            )
+            for i in new
+        )
+        self.size = size
+        # bulk_create не шлёт сигналов: число постов в ленте меняем
+        # вручную, а категории, местоположения, авторы и ближайшая
+        # отложенная публикация, которые работающий процесс держит
+        # в памяти, остаются прогретыми.
+        bump_generation()
+        get_tables()
+        next_publication()
+        users_by_id(get_user_model().objects.values_list('pk', flat=True))
+
+
+@pytest.fixture
+def dataset(mixer, user, published_category, published_location):
+    return Dataset(mixer, user, published_category, published_location)
+
+
+def _count_queries(client, method, url):
+    # Адреса GET несут свои параметры в строке запроса.
+    data = {'text': 'Комментарий'} if method == 'post' else None
+    with CaptureQueriesContext(connection) as ctx:
+        response = getattr(client, method)(url, data)
+    assert response.status_code in (200, 302), (
+        f'Убедитесь, что страница {url} загружается без ошибок.'
+    )
+    return len(ctx.captured_queries)
+
+
+@pytest.mark.parametrize('route', ROUTES)
+def test_query_budget(route, dataset, user_client, unlogged_client):
+    method, url, client_name, budget = ROUTES[route]
+    client = user_client if client_name == 'user' else unlogged_client
+    url = url.format(
+        category=dataset.category.slug,
+        username=dataset.user.username,
+        post=dataset.post.id,
+        comment=dataset.comment.id,
+    )
+    counts = {}
+    for size in (SMALL, LARGE):
+        dataset.grow(size)
+        counts[size] = _count_queries(client, method, url)
+        assert counts[size] <= budget, (
+            f'Убедитесь, что {route} ({url}) выполняет не больше {budget} '
+            f'запросов к базе; при {size} записях их {counts[size]}.'
+        )
+    assert counts[SMALL] == counts[LARGE], (
+        f'Убедитесь, что число запросов {route} ({url}) не растёт вместе '
+        f'с числом записей: {counts[SMALL]} при {SMALL} и '
+        f'{counts[LARGE]} при {LARGE}.'
+    )
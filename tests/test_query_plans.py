@@ -0,0 +1,72 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != 'sqlite',
+        reason='План запроса разбирается в формате SQLite.'
+    ),
+]
+
+
+def _plans_for(client, url, table):
+    """Планы выборок строк из `table`, выполненных при запросе страницы."""
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    plans = []
+    with connection.cursor() as cursor:
+        for query in ctx.captured_queries:
+            sql = query['sql']
+            if (
+                f'FROM "{table}"' not in sql
+                or 'ORDER BY' not in sql
+                or 'COUNT(*)' in sql
+            ):
+                continue
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plans.append(' '.join(str(row[-1]) for row in cursor.fetchall()))
+    assert plans, f'При запросе {url} не было выборки из {table}.'
+    return plans
+
+
+@pytest.mark.parametrize(
+    'url_name, index',
+    (
+        ('index', 'post_feed_idx'),
+        ('category', 'post_category_feed_idx'),
+        ('profile', 'post_author_feed_idx'),
+        ('own_profile', 'post_author_feed_idx'),
+    )
+)
+def test_feeds_use_index(
+        client, user_client, user, published_category,
+        many_posts_with_published_locations, url_name, index
+):
+    url = {
+        'index': '/',
+        'category': f'/category/{published_category.slug}/',
+        'profile': f'/profile/{user.username}/',
+        'own_profile': f'/profile/{user.username}/',
+    }[url_name]
+    viewer = user_client if url_name == 'own_profile' else client
+    for plan in _plans_for(viewer, url, 'blog_post'):
+        assert index in plan, (
+            f'Убедитесь, что выборка постов для {url} использует индекс '
+            f'{index}. План запроса: {plan}'
+        )
+        assert 'USE TEMP B-TREE FOR ORDER BY' not in plan, (
+            f'Убедитесь, что посты для {url} сортируются по индексу. '
+            f'План запроса: {plan}'
+        )
+
+
+def test_post_comments_use_index(client, comment_to_a_post):
+    url = f'/posts/{comment_to_a_post.post_id}/'
+    plans = _plans_for(client, url, 'blog_comments')
+    assert any('comments_post_created_idx' in plan for plan in plans), (
+        'Убедитесь, что комментарии к посту выбираются по индексу '
+        f'comments_post_created_idx. Планы запросов: {plans}'
+    )
@@ -0,0 +1,175 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+@pytest.fixture
+def replica(settings, tmp_path):
+    """Файловая реплика, заполненная командой sync_replicas."""
+    alias = 'replica1'
+    connections.databases[alias] = {
+        **connections.databases['default'],
+        'NAME': str(tmp_path / 'replica.sqlite3'),
+    }
+    settings.DATABASE_REPLICAS = [alias]
+    yield alias
+    connections[alias].close()
+    del connections[alias]
+    del connections.databases[alias]
+
+
+def _sync():
+    call_command('sync_replicas', stdout=StringIO())
+
+
+def test_feed_and_detail_read_from_replica(
+        client, replica, post_with_published_location
+):
+    post = post_with_published_location
+    _sync()
+    post.title = 'Ещё не на реплике'
+    post.save()
+    for url in ('/', f'/posts/{post.id}/'):
+        content = client.get(url).content.decode()
+        assert 'Ещё не на реплике' not in content, (
+            f'Убедитесь, что страница {url} читает данные с реплики.'
+        )
+    _sync()
+    content = client.get(f'/posts/{post.id}/').content.decode()
+    assert 'Ещё не на реплике' in content
+
+
+def test_session_pinned_to_primary_after_write(
+        user_client, replica, post_with_published_location
+):
+    post = post_with_published_location
+    _sync()
+    url = f'/posts/{post.id}/'
+    assert 'Свежий комментарий' not in user_client.get(url).content.decode()
+    user_client.post(f'{url}comment/', {'text': 'Свежий комментарий'})
+    assert 'Свежий комментарий' in user_client.get(url).content.decode(), (
+        'Убедитесь, что после записи сессия читает с основной базы.'
+    )
+
+
+def test_forms_read_from_primary(
+        user_client, replica, post_with_published_location
+):
+    post = post_with_published_location
+    _sync()
+    type(post).objects.filter(pk=post.pk).update(title='Только в основной')
+    content = user_client.get(f'/posts/{post.id}/edit/').content.decode()
+    assert 'Только в основной' in content, (
+        'Убедитесь, что формы редактирования читают с основной базы.'
+    )
+
+
+def test_cached_pages_follow_replica(
+        client, replica, mixer, user, published_category, settings
+):
+    from datetime import timedelta
+
+    from django.utils import timezone
+
+    assert settings.PAGE_CACHE_TIMEOUT
+    _sync()
+    # Пост есть только в основной базе; сигнал уже поднял поколение.
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=1),
+        image='',
+    )
+    urls = ('/', '/api/v1/posts/')
+    for url in urls:
+        assert post.title not in client.get(url).content.decode(), (
+            f'Убедитесь, что {url} с включённым кэшем страниц читает '
+            'данные с реплики.'
+        )
+        with CaptureQueriesContext(connections[replica]) as context:
+            client.get(url)
+        assert not context.captured_queries, (
+            f'Убедитесь, что {url}, прочитанная с реплики, кэшируется '
+            'под поколением данных реплики.'
+        )
+    _sync()
+    for url in urls:
+        assert post.title in client.get(url).content.decode(), (
+            f'Убедитесь, что после синхронизации реплики {url} '
+            'не отдаётся из кэша её прошлого поколения.'
+        )
+
+
+def test_unsynced_replica_not_cached(
+        client, replica, post_with_published_location
+):
+    from django.core.cache import cache
+
+    from blog.cache import REPLICA_GENERATION_KEY
+
+    _sync()
+    cache.delete(REPLICA_GENERATION_KEY.format(replica))
+    client.get('/')
+    with CaptureQueriesContext(connections[replica]) as context:
+        client.get('/')
+    assert context.captured_queries, (
+        'Убедитесь, что страница с реплики неизвестного поколения '
+        'не попадает в кэш.'
+    )
+
+
+def test_count_not_cached_from_replica(
+        client, replica, mixer, user, published_category
+):
+    from datetime import timedelta
+
+    from django.utils import timezone
+
+    _sync()
+    mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=1),
+        image='',
+    )
+    assert client.get('/').context['paginator'].count == 0
+    _sync()
+    assert client.get('/').context['paginator'].count == 1, (
+        'Убедитесь, что число постов, прочитанное с отстающей реплики, '
+        'не сохраняется в кэш под новым поколением.'
+    )
+
+
+def test_no_validators_from_lagging_replica(
+        client, replica, mixer, user, published_category
+):
+    from datetime import timedelta
+
+    from django.utils import timezone
+
+    _sync()
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=1),
+        image='',
+    )
+    for url in (f'/profile/{user.username}/', '/api/v1/posts/'):
+        response = client.get(url)
+        assert post.title not in response.content.decode()
+        assert not response.has_header('ETag'), (
+            f'Убедитесь, что {url}, собранная по отстающей реплике, '
+            'не получает ETag текущих данных.'
+        )
+        assert not response.has_header('Last-Modified')
+    _sync()
+    for url in (f'/profile/{user.username}/', '/api/v1/posts/'):
+        response = client.get(url)
+        assert post.title in response.content.decode()
+        assert client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag']
+        ).status_code == 304, (
+            f'Убедитесь, что {url} с догнавшей реплики отдаёт ETag.'
+        )
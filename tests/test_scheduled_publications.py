@@ -0,0 +1,82 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def scheduled_post(mixer, user, published_category):
+    return mixer.blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() + timedelta(days=1),
+    )
+
+
+def test_schedule_follows_post(scheduled_post):
+    from blog.models import ScheduledPublication
+    from blog.schedule import next_go_live
+
+    assert ScheduledPublication.objects.filter(
+        post=scheduled_post, pub_date=scheduled_post.pub_date
+    ).exists(), (
+        'Убедитесь, что пост с датой публикации в будущем попадает '
+        'в расписание отложенных публикаций.'
+    )
+    assert next_go_live() >= scheduled_post.pub_date
+
+    scheduled_post.is_published = False
+    scheduled_post.save()
+    assert not ScheduledPublication.objects.exists()
+    assert next_go_live() is None
+
+    scheduled_post.is_published = True
+    scheduled_post.pub_date = timezone.now() - timedelta(days=1)
+    scheduled_post.save()
+    assert not ScheduledPublication.objects.exists(), (
+        'Убедитесь, что уже вышедший пост не остаётся в расписании.'
+    )
+
+
+def test_command_lists_affected_feeds(scheduled_post):
+    out = StringIO()
+    call_command('scheduled_publications', stdout=out)
+    output = out.getvalue()
+    assert scheduled_post.title in output
+    for url in (
+        '/',
+        f'/posts/{scheduled_post.id}/',
+        f'/category/{scheduled_post.category.slug}/',
+        f'/profile/{scheduled_post.author.username}/',
+    ):
+        assert url in output
+
+
+@pytest.mark.django_db(transaction=True)
+def test_command_warms_published_feeds(
+        client, live_server, scheduled_post, django_assert_num_queries
+):
+    from blog.models import ScheduledPublication
+
+    ScheduledPublication.objects.update(
+        pub_date=timezone.now() - timedelta(minutes=5)
+    )
+    type(scheduled_post).objects.filter(pk=scheduled_post.pk).update(
+        pub_date=timezone.now() - timedelta(minutes=5)
+    )
+    call_command(
+        'scheduled_publications', warm=live_server.url, stdout=StringIO()
+    )
+    assert not ScheduledPublication.objects.exists()
+    host = live_server.url.split('//')[1]
+    with django_assert_num_queries(0):
+        response = client.get('/', HTTP_HOST=host)
+    assert scheduled_post.title in response.content.decode(), (
+        'Убедитесь, что прогрев кладёт в кэш ленту с вышедшей публикацией.'
+    )
@@ -0,0 +1,119 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from conftest import N_PER_PAGE
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != 'sqlite',
+        reason='Поиск построен на SQLite FTS5.'
+    ),
+]
+
+
+@pytest.fixture
+def blend_post(mixer, user, published_category):
+    def blend(**kwargs):
+        return mixer.blend(
+            'blog.Post',
+            **{
+                'author': user,
+                'category': published_category,
+                'is_published': True,
+                'pub_date': timezone.now() - timedelta(days=1),
+                **kwargs,
+            }
+        )
+    return blend
+
+
+def _found(client, query, **params):
+    response = client.get('/search/', {'q': query, **params})
+    assert response.status_code == 200, (
+        'Убедитесь, что страница поиска загружается без ошибок.'
+    )
+    return response, [post.id for post in response.context['page_obj']]
+
+
+def test_search_ranks_title_above_text(client, blend_post):
+    in_text = blend_post(title='Заметка', text='Про зелёные яблоки.')
+    in_title = blend_post(title='Яблоки', text='Урожай этого года.')
+    blend_post(title='Груши', text='Совсем о другом.')
+    _, found = _found(client, 'яблоки')
+    assert found == [in_title.id, in_text.id], (
+        'Убедитесь, что поиск находит слово в заголовке и тексте и '
+        'ставит совпадения в заголовке выше.'
+    )
+
+
+def test_search_hides_unpublished(
+        client, blend_post, mixer, published_category
+):
+    hidden_category = mixer.blend('blog.Category', is_published=False)
+    visible = blend_post(title='Секрет виден')
+    blend_post(title='Секрет снят', is_published=False)
+    blend_post(
+        title='Секрет в будущем',
+        pub_date=timezone.now() + timedelta(days=1)
+    )
+    blend_post(title='Секрет в скрытой категории', category=hidden_category)
+    _, found = _found(client, 'секрет')
+    assert found == [visible.id], (
+        'Убедитесь, что поиск показывает только то, что видно в ленте.'
+    )
+
+
+def test_search_index_follows_changes(client, blend_post):
+    post = blend_post(title='Старое название')
+    post.title = 'Новое название'
+    post.save()
+    assert _found(client, 'старое')[1] == []
+    assert _found(client, 'новое')[1] == [post.id], (
+        'Убедитесь, что индекс поиска обновляется при изменении поста.'
+    )
+    post.delete()
+    assert _found(client, 'новое')[1] == []
+
+
+def test_search_keyset_pages(client, blend_post):
+    posts = [
+        blend_post(title='Облако', text=' '.join(['облако'] * number))
+        for number in range(1, N_PER_PAGE + 6)
+    ]
+    response, first = _found(client, 'облако')
+    page_obj = response.context['page_obj']
+    assert len(first) == N_PER_PAGE and page_obj.has_next()
+    assert 'q=%D0%BE%D0%B1%D0%BB%D0%B0%D0%BA%D0%BE&cursor=' in (
+        response.content.decode()
+    ), 'Убедитесь, что ссылки на страницы поиска сохраняют запрос.'
+    _, second = _found(client, 'облако', cursor=page_obj.next_cursor)
+    assert sorted(first + second) == sorted(post.id for post in posts), (
+        'Убедитесь, что страницы поиска выдают все совпадения без повторов.'
+    )
+
+
+def test_search_empty_query(client, blend_post):
+    blend_post(title='Что угодно')
+    assert _found(client, '')[1] == []
+    assert _found(client, '"(*')[1] == []
+
+
+def test_search_uses_fts_index(client, blend_post):
+    blend_post(title='Индекс')
+    with CaptureQueriesContext(connection) as ctx:
+        _found(client, 'индекс')
+    sql = next(
+        query['sql'] for query in ctx.captured_queries
+        if 'MATCH' in query['sql']
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+    assert 'VIRTUAL TABLE INDEX' in plan and 'SCAN blog_post ' not in plan, (
+        'Убедитесь, что поиск идёт по индексу FTS5, а не перебором постов.'
+    )
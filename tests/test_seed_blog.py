@@ -0,0 +1,72 @@
+from io import StringIO
+
+import pytest
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def seed(**options):
+    options = {
+        'users': 5, 'categories': 3, 'locations': 3, 'posts': 200,
+        'comments': 200, 'images': 2, 'batch_size': 25, **options,
+    }
+    call_command('seed_blog', stdout=StringIO(), **options)
+
+
+@pytest.fixture(autouse=True)
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+def test_seed_blog_fills_tables():
+    from blog.images import variant_name
+    from blog.models import Category, Comments, Location, Post
+    from django.contrib.auth import get_user_model
+
+    seed()
+    assert get_user_model().objects.filter(
+        username__startswith='seed'
+    ).count() == 5
+    assert Category.objects.count() == 3
+    assert Location.objects.count() == 3
+    assert Post.objects.count() == 200
+    assert Comments.objects.count() == 200
+    assert Post.objects.filter(pub_date__gt=timezone.now()).exists(), (
+        'Убедитесь, что среди публикаций есть отложенные.'
+    )
+    assert Post.objects.filter(is_published=False).exists(), (
+        'Убедитесь, что среди публикаций есть скрытые.'
+    )
+    post = Post.objects.exclude(image='').first()
+    assert post is not None, 'Убедитесь, что у части публикаций есть фото.'
+    assert default_storage.exists(variant_name(post.image.name, 'card'))
+    for post in Post.objects.all():
+        assert post.comment_count == post.comments.filter(
+            is_published=True
+        ).count(), 'Убедитесь, что счётчики комментариев пересчитаны.'
+
+
+def test_seed_blog_deterministic_with_workers():
+    from blog.models import Comments, Post
+
+    def snapshot(first_post):
+        posts = Post.objects.filter(pk__gte=first_post).order_by('pk')
+        return (
+            list(posts.values_list('title', 'pub_date__date', 'is_published')),
+            list(
+                Comments.objects.filter(post__pk__gte=first_post)
+                .order_by('pk').values_list('text', flat=True)
+            ),
+        )
+
+    seed(prefix='one')
+    first = snapshot(0)
+    second_post = Post.objects.count() + 1
+    seed(prefix='two', workers=2)
+    assert snapshot(second_post) == first, (
+        'Убедитесь, что при одинаковом --seed данные совпадают '
+        'независимо от числа процессов.'
+    )
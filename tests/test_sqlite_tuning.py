@@ -0,0 +1,63 @@
+import importlib
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+
+
+@pytest.mark.django_db
+def test_pragmas_applied_to_new_connections(settings):
+    assert settings.DATABASES['default']['ENGINE'] == 'blogicum.sqlite', (
+        'Убедитесь, что проект подключает SQLite через бэкенд '
+        'blogicum.sqlite.'
+    )
+    settings.SQLITE_PRAGMAS = {'cache_size': -1234}
+    connection = connections.create_connection('default')
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA cache_size')
+            assert cursor.fetchone()[0] == -1234, (
+                'Убедитесь, что соединение SQLite настраивается по '
+                'settings.SQLITE_PRAGMAS.'
+            )
+    finally:
+        connection.close()
+
+
+def _production(monkeypatch, **environ):
+    for name in ('DJANGO_SECRET_KEY', 'DJANGO_ALLOWED_HOSTS'):
+        monkeypatch.delenv(name, raising=False)
+    for name, value in environ.items():
+        monkeypatch.setenv(name, value)
+    from blogicum import settings_production
+
+    return importlib.reload(settings_production)
+
+
+def test_production_profile(monkeypatch):
+    settings_production = _production(
+        monkeypatch,
+        DJANGO_SECRET_KEY='secret-from-environment',
+        DJANGO_ALLOWED_HOSTS='blogicum.example,www.blogicum.example',
+    )
+    assert settings_production.DEBUG is False, (
+        'Убедитесь, что в профиле production отключён DEBUG.'
+    )
+    assert settings_production.SECRET_KEY == 'secret-from-environment'
+    assert settings_production.ALLOWED_HOSTS == [
+        'blogicum.example', 'www.blogicum.example'
+    ]
+    assert settings_production.SQLITE_PRAGMAS['journal_mode'] == 'WAL'
+    for pragma in ('synchronous', 'mmap_size', 'cache_size', 'busy_timeout'):
+        assert pragma in settings_production.SQLITE_PRAGMAS
+    database = settings_production.DATABASES['default']
+    assert database['CONN_MAX_AGE'] > 0, (
+        'Убедитесь, что в профиле соединения переиспользуются.'
+    )
+
+
+def test_production_profile_requires_secrets(monkeypatch):
+    with pytest.raises(ImproperlyConfigured):
+        _production(monkeypatch, DJANGO_ALLOWED_HOSTS='blogicum.example')
+    with pytest.raises(ImproperlyConfigured):
+        _production(monkeypatch, DJANGO_SECRET_KEY='secret')
@@ -0,0 +1,191 @@
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from PIL import Image
+
+pytestmark = [pytest.mark.django_db]
+
+
+def process_queue():
+    call_command('process_image_jobs', once=True, stdout=StringIO())
+
+
+def test_variants_created_by_worker(post_with_published_location):
+    from blog.images import VARIANTS, variant_name
+
+    process_queue()
+    name = post_with_published_location.image.name
+    for variant, size in VARIANTS.items():
+        for fmt in ('jpeg', 'webp'):
+            path = variant_name(name, variant, fmt)
+            assert default_storage.exists(path), (
+                'Убедитесь, что обработчик очереди создаёт рядом с картинкой '
+                f'уменьшенную копию {path}.'
+            )
+            with default_storage.open(path) as file:
+                assert max(Image.open(file).size) <= size
+
+
+def test_pages_use_variants(user_client, post_with_published_location):
+    post = post_with_published_location
+    process_queue()
+    stem = post.image.name.rsplit('.', 1)[0]
+    for url, variant in (('/', 'card'), (f'/posts/{post.id}/', 'detail')):
+        content = user_client.get(url).content.decode()
+        assert f'{stem}_{variant}.jpeg' in content, (
+            f'Убедитесь, что на странице {url} показывается уменьшенная '
+            'копия картинки.'
+        )
+        assert f'{stem}_{variant}.webp' in content
+
+
+def test_backfill_command(post_with_published_location):
+    from blog.images import variant_names
+
+    names = variant_names(post_with_published_location.image.name)
+    for name in names:
+        default_storage.delete(name)
+    out = StringIO()
+    call_command('make_thumbnails', workers=1, stdout=out)
+    assert all(default_storage.exists(name) for name in names), (
+        'Убедитесь, что команда make_thumbnails создаёт недостающие копии.'
+    )
+
+
+def test_placeholder_until_processed(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    content = user_client.get('/').content.decode()
+    assert 'placeholder.svg' in content, (
+        'Убедитесь, что до обработки картинки показывается заглушка.'
+    )
+    assert post.image.name not in content
+    process_queue()
+    content = user_client.get('/').content.decode()
+    assert 'placeholder.svg' not in content, (
+        'Убедитесь, что после обработки карточка показывает картинку.'
+    )
+
+
+def test_worker_strips_exif(mixer, user):
+    from django.core.files.uploadedfile import SimpleUploadedFile
+
+    from blog.models import ImageJob
+
+    exif = Image.Exif()
+    exif[0x010F] = 'Секретная камера'
+    buffer = BytesIO()
+    Image.new('RGB', (50, 30)).save(buffer, 'JPEG', exif=exif)
+    post = mixer.blend(
+        'blog.Post', author=user,
+        image=SimpleUploadedFile('exif.jpg', buffer.getvalue())
+    )
+    assert ImageJob.objects.filter(
+        post=post, status=ImageJob.PENDING
+    ).exists(), 'Убедитесь, что загрузка картинки ставит задание в очередь.'
+    process_queue()
+    with default_storage.open(post.image.name) as file:
+        assert not Image.open(file).getexif(), (
+            'Убедитесь, что обработчик убирает из картинки EXIF.'
+        )
+    post.refresh_from_db()
+    assert post.image_ready
+
+
+def test_broken_image_job_fails(mixer, user, client, published_category):
+    from datetime import timedelta
+
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from django.utils import timezone
+
+    from blog.models import ImageJob
+
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=1),
+        image=SimpleUploadedFile('broken.jpg', b'not an image')
+    )
+    process_queue()
+    job = ImageJob.objects.get(post=post)
+    assert job.status == ImageJob.FAILED and job.attempts == 1, (
+        'Убедитесь, что файл, который не прошёл проверку, сразу помечает '
+        'задание ошибкой, без повторных попыток.'
+    )
+    assert 'UnidentifiedImageError' in job.error
+    content = client.get(f'/posts/{post.id}/').content.decode()
+    assert 'placeholder.svg' in content and post.image.url not in content, (
+        'Убедитесь, что файл, который не прошёл проверку, не показывается '
+        'читателям.'
+    )
+
+
+def test_storage_errors_retried(
+        monkeypatch, client, post_with_published_location
+):
+    from datetime import timedelta
+
+    from django.utils import timezone
+
+    from blog.models import ImageJob
+
+    def unavailable(name):
+        raise OSError('Хранилище недоступно')
+
+    monkeypatch.setattr('blog.jobs.process_image', unavailable)
+    post = post_with_published_location
+    jobs = ImageJob.objects.filter(post=post)
+    delays = []
+    for attempt in range(1, 3):
+        process_queue()
+        job = jobs.get()
+        assert job.status == ImageJob.PENDING and job.attempts == attempt, (
+            'Убедитесь, что после сбоя хранилища задание ждёт повторной '
+            'попытки, а не выполняется снова сразу.'
+        )
+        delays.append(job.not_before - timezone.now())
+        process_queue()
+        assert jobs.get().attempts == attempt
+        jobs.update(not_before=timezone.now())
+    assert delays[1] > delays[0] > timedelta(0), (
+        'Убедитесь, что пауза перед повторной попыткой растёт.'
+    )
+    process_queue()
+    job = jobs.get()
+    assert job.status == ImageJob.FAILED and 'OSError' in job.error
+    post.refresh_from_db()
+    content = client.get(f'/posts/{post.id}/').content.decode()
+    assert 'placeholder.svg' not in content and post.image.url in content, (
+        'Убедитесь, что после сбоев хранилища показывается оригинал.'
+    )
+
+
+def test_stale_job_attempts_limited(mixer, user):
+    from datetime import timedelta
+
+    from django.utils import timezone
+
+    from blog.jobs import requeue_stale
+    from blog.models import ImageJob
+
+    post = mixer.blend('blog.Post', author=user, image='')
+    job = ImageJob.objects.create(
+        post=post, image='crash.jpg', status=ImageJob.RUNNING, attempts=1
+    )
+    stale = ImageJob.objects.filter(pk=job.pk)
+    stale.update(updated_at=timezone.now() - timedelta(hours=1))
+    assert requeue_stale(timedelta(minutes=10), max_attempts=2) == 1
+    job.refresh_from_db()
+    assert job.status == ImageJob.PENDING
+    assert job.not_before > timezone.now()
+    stale.update(
+        status=ImageJob.RUNNING, attempts=2,
+        updated_at=timezone.now() - timedelta(hours=1)
+    )
+    assert requeue_stale(timedelta(minutes=10), max_attempts=2) == 0
+    assert stale.get().status == ImageJob.FAILED, (
+        'Убедитесь, что задание, которое роняет обработчик, не '
+        'возвращается в очередь бесконечно.'
+    )
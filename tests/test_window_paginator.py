@@ -0,0 +1,76 @@
+import re
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+N_PAGES = 30
+
+
+@pytest.fixture(autouse=True)
+def disable_page_cache():
+    with override_settings(PAGE_CACHE_TIMEOUT=0):
+        yield
+
+
+@pytest.fixture
+def many_posts(mixer, user, published_category):
+    return mixer.cycle(N_PER_PAGE * N_PAGES).blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+
+
+def _page_links(content):
+    return set(re.findall(r'href="\?page=(\d+)"', content))
+
+
+def test_page_links_windowed(client, many_posts):
+    content = client.get('/', {'page': 15}).content.decode()
+    links = _page_links(content)
+    assert {'1', '13', '14', '16', '17', str(N_PAGES)} <= links, (
+        'Убедитесь, что пагинатор показывает соседние страницы и края ленты.'
+    )
+    assert '5' not in links and '25' not in links, (
+        'Убедитесь, что пагинатор не выводит ссылки на все страницы ленты.'
+    )
+    assert '…' in content
+
+
+def test_count_cached_until_content_changes(
+        client, many_posts, mixer, user, published_category
+):
+    def count_queries():
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get('/', {'page': 2})
+        return response, [
+            query for query in ctx.captured_queries
+            if 'COUNT(*)' in query['sql']
+        ]
+
+    count_queries()
+    response, counts = count_queries()
+    assert not counts, (
+        'Убедитесь, что число постов в ленте берётся из кэша.'
+    )
+    assert response.context['paginator'].num_pages == N_PAGES
+    mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    response, counts = count_queries()
+    assert len(counts) == 1
+    assert response.context['paginator'].num_pages == N_PAGES + 1, (
+        'Убедитесь, что новый пост сбрасывает закэшированное число постов.'
+    )